@@ -7,6 +7,9 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ORDER_ARCHIVE_HORIZON_DAYS: int = 90  # Órdenes cerradas más antiguas pasan a las tablas *_archive
+    OUTBOX_WORKERS: int = 2  # Hilos que procesan los efectos secundarios de las órdenes
+    MENU_AUTO_AVAILABILITY: bool = False  # Marcar platillos no disponibles cuando no alcanzan los ingredientes
 
     class Config:
         env_file = ".env"
@@ -5,6 +5,8 @@ from .database import engine, Base, SessionLocal
 from .routers import auth, users, products, tables, orders, menu, configuration, profile, payment_methods, upload, public, permissions, roles, system_permissions, customers, accounts_receivable, accounts_payable, statistics
 from .models.user import User, UserRole
 from .utils.security import get_password_hash
+from .utils.outbox import outbox_workers
+from .utils.order_events import order_event_listener
 import os
 
 # Crear las tablas
@@ -51,6 +53,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Cursor de paginación de órdenes
 )
 
 # Incluir routers
@@ -83,6 +86,20 @@ os.makedirs(UPLOAD_IMAGES_DIR, exist_ok=True)
 app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
 
 
+@app.on_event("startup")
+def start_outbox_workers():
+    """Procesar en segundo plano los efectos secundarios de las órdenes"""
+    outbox_workers.start()
+    # Eventos de órdenes confirmados en cualquier proceso (LISTEN/NOTIFY)
+    order_event_listener.start()
+
+
+@app.on_event("shutdown")
+def stop_outbox_workers():
+    outbox_workers.stop()
+    order_event_listener.stop()
+
+
 @app.get("/")
 def root():
     return {
@@ -11,6 +11,9 @@ from .role_permission import Role, Permission, role_permissions, user_roles
 from .customer import Customer
 from .account_receivable import AccountReceivable, AccountReceivablePayment, AccountStatus as AccountReceivableStatus
 from .account_payable import AccountPayable, AccountPayablePayment, AccountStatus as AccountPayableStatus
+from .idempotency_key import IdempotencyKey
+from .order_archive import OrderArchive, OrderItemArchive, OrderPaymentArchive
+from .order_outbox import OrderOutbox
 
 __all__ = [
     "User",
@@ -41,4 +44,9 @@ __all__ = [
     "AccountPayable",
     "AccountPayablePayment",
     "AccountPayableStatus",
+    "IdempotencyKey",
+    "OrderArchive",
+    "OrderItemArchive",
+    "OrderPaymentArchive",
+    "OrderOutbox",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, Boolean, CheckConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -21,7 +21,7 @@ class BusinessConfiguration(Base):
     address = Column(Text)
     
     # Configuración fiscal
-    tax_rate = Column(Float, default=0.16)  # Tasa de impuesto (16% por defecto)
+    tax_rate = Column(Float, default=16)  # Tasa de impuesto en porcentaje (16 = 16%)
     currency = Column(String, default="USD")  # Moneda
     
     # Logo
@@ -34,6 +34,10 @@ class BusinessConfiguration(Base):
     partners = relationship("Partner", back_populates="business", cascade="all, delete-orphan")
     users = relationship("User", back_populates="business")
     customers = relationship("Customer", back_populates="business")
+    
+    __table_args__ = (
+        CheckConstraint("tax_rate >= 0 AND tax_rate <= 100", name="ck_business_configuration_tax_rate_percent"),
+    )
 
 
 class Partner(Base):
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class IdempotencyKey(Base):
+    """Respuesta guardada de una solicitud con encabezado Idempotency-Key"""
+    __tablename__ = "idempotency_keys"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    business_id = Column(Integer, ForeignKey("business_configuration.id", ondelete='CASCADE'), nullable=True)
+    scope = Column(String, nullable=False)  # Operación protegida: orders.create, orders.{id}.payments
+    key = Column(String, nullable=False)  # Valor enviado por el cliente
+    
+    request_hash = Column(String(64), nullable=False)  # SHA-256 del cuerpo de la solicitud original
+    response_hash = Column(String(64), nullable=True)  # SHA-256 de la respuesta guardada
+    response_body = Column(Text, nullable=True)  # NULL mientras la solicitud original se procesa
+    status_code = Column(Integer, nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+# Único por (negocio, operación, clave); COALESCE porque en UNIQUE los NULL son distintos
+# y las claves de usuarios sin negocio no quedarían protegidas
+Index(
+    "uq_idempotency_keys_business_scope_key",
+    func.coalesce(IdempotencyKey.business_id, 0),
+    IdempotencyKey.scope,
+    IdempotencyKey.key,
+    unique=True,
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Boolean, DateTime, Text, Table
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Boolean, DateTime, Text, Table, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -10,7 +10,9 @@ menu_item_ingredients = Table(
     Base.metadata,
     Column('menu_item_id', Integer, ForeignKey('menu_items.id', ondelete='CASCADE'), primary_key=True),
     Column('product_id', Integer, ForeignKey('products.id', ondelete='CASCADE'), primary_key=True),
-    Column('quantity', Float, nullable=False)  # Cantidad del ingrediente necesaria
+    Column('quantity', Float, nullable=False),  # Cantidad del ingrediente necesaria
+    # La clave primaria empieza por menu_item_id: este índice resuelve producto -> platillos
+    Index('ix_menu_item_ingredients_product_id', 'product_id'),
 )
 
 
@@ -18,14 +20,33 @@ class MenuCategory(Base):
     __tablename__ = "menu_categories"
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, unique=True, nullable=False)
+    name = Column(String, nullable=False)
     description = Column(Text)
     display_order = Column(Integer, default=0)  # Orden de visualización
     is_active = Column(Boolean, default=True)
+    business_id = Column(Integer, ForeignKey("business_configuration.id", ondelete='CASCADE'), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     deleted_at = Column(DateTime(timezone=True), nullable=True)  # Soft delete
     
     menu_items = relationship("MenuItem", back_populates="category")
+    
+    __table_args__ = (
+        # Nombre único dentro del negocio, sin contar las categorías eliminadas
+        Index(
+            "uq_menu_categories_business_id_name",
+            "business_id",
+            "name",
+            unique=True,
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        # Categorías activas del negocio en orden de visualización (listado y catálogo público)
+        Index(
+            "ix_menu_categories_business_id_display_order",
+            "business_id",
+            "display_order",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
 
 
 class MenuItem(Base):
@@ -35,6 +56,7 @@ class MenuItem(Base):
     name = Column(String, nullable=False, index=True)
     description = Column(Text)
     category_id = Column(Integer, ForeignKey("menu_categories.id"), nullable=False)
+    business_id = Column(Integer, ForeignKey("business_configuration.id", ondelete='CASCADE'), nullable=True)
     
     # Precios y configuración
     price = Column(Float, nullable=False)  # Precio de venta del platillo
@@ -42,7 +64,10 @@ class MenuItem(Base):
     
     # Disponibilidad
     is_available = Column(Boolean, default=True)
+    auto_disabled = Column(Boolean, default=False, nullable=False)  # Apagado por falta de stock (MENU_AUTO_AVAILABILITY), no por el gerente
     is_featured = Column(Boolean, default=False)  # Platillo destacado/recomendado
+    portions_available = Column(Integer, nullable=True)  # Según stock de ingredientes (NULL = sin receta)
+    recipe_cost = Column(Float, nullable=True)  # Suma de cantidad * precio de compra (NULL = sin receta)
     
     # Imágenes y extras
     image_url = Column(String)  # URL de la imagen del platillo
@@ -54,4 +79,15 @@ class MenuItem(Base):
     category = relationship("MenuCategory", back_populates="menu_items")
     # Ingredientes necesarios para preparar este platillo
     ingredients = relationship("Product", secondary=menu_item_ingredients, backref="menu_items")
+    
+    # Índices parciales por negocio: solo filas no eliminadas
+    __table_args__ = (
+        Index("ix_menu_items_business_id_active", "business_id", "id", postgresql_where=text("deleted_at IS NULL")),
+        # Menú público (GET /public/{slug}/menu)
+        Index(
+            "ix_menu_items_business_id_available",
+            "business_id",
+            postgresql_where=text("is_available = true AND deleted_at IS NULL"),
+        ),
+    )
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum, Text
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum, Text, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -12,6 +12,10 @@ class OrderStatus(str, enum.Enum):
     CANCELLED = "cancelled"     # Cancelada
 
 
+# Órdenes que mantienen ocupada una mesa (respaldadas por ix_orders_active_table_id)
+ACTIVE_ORDER_STATUSES = [OrderStatus.PENDING.value, OrderStatus.PREPARING.value]
+
+
 class PaymentMethod(str, enum.Enum):
     CASH = "cash"
     CARD = "card"
@@ -31,6 +35,7 @@ class Order(Base):
     id = Column(Integer, primary_key=True, index=True)
     table_id = Column(Integer, ForeignKey("tables.id"), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Mesero que atiende
+    business_id = Column(Integer, ForeignKey("business_configuration.id", ondelete='CASCADE'), nullable=True)  # Desnormalizado desde el usuario
     
     status = Column(String, default=OrderStatus.PENDING.value, nullable=False)  # Use string to store enum value
     payment_method = Column(String, nullable=True)  # Deprecated, usar payments
@@ -55,6 +60,23 @@ class Order(Base):
     
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
     payments = relationship("OrderPayment", back_populates="order", cascade="all, delete-orphan")
+    
+    # Índices para el listado paginado por (created_at, id) y sus filtros;
+    # las consultas siempre filtran por negocio, por eso business_id va primero
+    __table_args__ = (
+        Index("ix_orders_business_id_created_at_id", "business_id", "created_at", "id"),
+        Index("ix_orders_business_id_status_created_at_id", "business_id", "status", "created_at", "id"),
+        Index("ix_orders_business_id_payment_status_created_at_id", "business_id", "payment_status", "created_at", "id"),
+        Index("ix_orders_table_id_created_at_id", "table_id", "created_at", "id"),
+        Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Orden activa de cada mesa: índice parcial, solo contiene los tickets abiertos
+        Index(
+            "ix_orders_active_table_id",
+            "table_id",
+            "created_at",
+            postgresql_where=text("status IN ('pending', 'preparing')"),
+        ),
+    )
 
 
 class OrderItem(Base):
@@ -0,0 +1,78 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class OrderArchive(Base):
+    """Órdenes cerradas más antiguas que ORDER_ARCHIVE_HORIZON_DAYS (particionada por mes)"""
+    __tablename__ = "orders_archive"
+
+    # La clave de partición (created_at) debe formar parte de la clave primaria
+    id = Column(Integer, primary_key=True, autoincrement=False)  # Mismo id que tenía en orders
+    created_at = Column(DateTime(timezone=True), primary_key=True)
+    table_id = Column(Integer, nullable=True)
+    user_id = Column(Integer, nullable=False)
+    business_id = Column(Integer, nullable=True)
+
+    status = Column(String, nullable=False)
+    payment_method = Column(String, nullable=True)
+    payment_status = Column(String, nullable=False)
+
+    subtotal = Column(Float, default=0)
+    tax = Column(Float, default=0)
+    discount = Column(Float, default=0)
+    total = Column(Float, default=0)
+
+    customer_name = Column(String, nullable=True)
+    customer_email = Column(String, nullable=True)
+    customer_phone = Column(String, nullable=True)
+
+    notes = Column(Text)
+
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    paid_at = Column(DateTime(timezone=True), nullable=True)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_orders_archive_business_id_created_at", "business_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+class OrderItemArchive(Base):
+    """Items de las órdenes archivadas (particionada por el mes de la orden)"""
+    __tablename__ = "order_items_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    order_created_at = Column(DateTime(timezone=True), primary_key=True)  # created_at de la orden
+    order_id = Column(Integer, nullable=False)
+
+    product_id = Column(Integer, nullable=True)
+    menu_item_id = Column(Integer, nullable=True)
+    source_type = Column(String, default="product")
+
+    quantity = Column(Float, nullable=False)
+    unit_price = Column(Float, nullable=False)
+    subtotal = Column(Float, nullable=False)
+
+    notes = Column(Text)
+
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_order_items_archive_order_id", "order_id"),
+        {"postgresql_partition_by": "RANGE (order_created_at)"},
+    )
+
+
+class OrderPaymentArchive(Base):
+    """Pagos de las órdenes archivadas"""
+    __tablename__ = "order_payments_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    order_id = Column(Integer, nullable=False, index=True)
+    payment_method_id = Column(Integer, nullable=False)
+    amount = Column(Float, nullable=False)
+    reference = Column(String, nullable=True)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, text
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class OrderOutbox(Base):
+    """Efecto secundario pendiente de una orden, escrito en la misma transacción que la orden"""
+    __tablename__ = "order_outbox"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    business_id = Column(Integer, nullable=True)
+    event_type = Column(String, nullable=False)  # order_created, table_released, ...
+    payload = Column(Text, nullable=False)  # JSON
+    
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)  # Reintentos diferidos
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Solo se indexan las filas pendientes: el índice se mantiene pequeño aunque la tabla crezca
+    __table_args__ = (
+        Index(
+            "ix_order_outbox_pending",
+            "available_at",
+            "id",
+            postgresql_where=text("processed_at IS NULL"),
+        ),
+    )
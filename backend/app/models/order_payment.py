@@ -15,3 +15,8 @@ class OrderPayment(Base):
     order = relationship("Order", back_populates="payments")
     payment_method = relationship("PaymentMethod")
 
+    @property
+    def payment_method_name(self):
+        """Nombre del método de pago (usar con la relación precargada)"""
+        return self.payment_method.name if self.payment_method else None
+
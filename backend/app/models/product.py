@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, Enum, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, Enum, Text, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -18,12 +18,24 @@ class Category(Base):
     __tablename__ = "categories"
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, unique=True, nullable=False)
+    name = Column(String, nullable=False)
     description = Column(Text)
+    business_id = Column(Integer, ForeignKey("business_configuration.id", ondelete='CASCADE'), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     deleted_at = Column(DateTime(timezone=True), nullable=True)  # Soft delete
     
     products = relationship("Product", back_populates="category")
+    
+    __table_args__ = (
+        # Nombre único dentro del negocio, sin contar las categorías eliminadas
+        Index(
+            "uq_categories_business_id_name",
+            "business_id",
+            "name",
+            unique=True,
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
 
 
 class Product(Base):
@@ -33,6 +45,7 @@ class Product(Base):
     name = Column(String, nullable=False, index=True)
     description = Column(Text)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    business_id = Column(Integer, ForeignKey("business_configuration.id", ondelete='CASCADE'), nullable=True)
     unit_type = Column(Enum(UnitType), default=UnitType.UNIT, nullable=False)
     
     # Precios
@@ -54,4 +67,15 @@ class Product(Base):
     deleted_at = Column(DateTime(timezone=True), nullable=True)  # Soft delete
     
     category = relationship("Category", back_populates="products")
+    
+    # Índices parciales por negocio: solo filas no eliminadas
+    __table_args__ = (
+        Index("ix_products_business_id_active", "business_id", postgresql_where=text("deleted_at IS NULL")),
+        # Catálogo público (GET /public/{slug}/products)
+        Index(
+            "ix_products_business_id_catalog",
+            "business_id",
+            postgresql_where=text("show_in_catalog = true AND deleted_at IS NULL"),
+        ),
+    )
 
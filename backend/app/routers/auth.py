@@ -9,6 +9,7 @@ from ..models.configuration import BusinessConfiguration
 from ..schemas.user import Token, LoginRequest, UserCreate, UserResponse
 from ..schemas.auth import RegisterRequest, RegisterResponse
 from ..utils.security import verify_password, get_password_hash, create_access_token
+from ..utils.slug_cache import invalidate_slugs
 from ..config import settings
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
@@ -69,7 +70,7 @@ def register(register_data: RegisterRequest, db: Session = Depends(get_db)):
             slug=slug,
             legal_name=register_data.legal_name,
             phone=register_data.phone,
-            tax_rate=0.16,
+            tax_rate=16,  # Porcentaje
             currency="USD"
         )
         db.add(new_business)
@@ -94,6 +95,7 @@ def register(register_data: RegisterRequest, db: Session = Depends(get_db)):
         db.commit()
         db.refresh(new_business)
         db.refresh(new_user)
+        invalidate_slugs(new_business.slug)  # Puede estar guardado como inexistente
         
         return RegisterResponse(
             message="Negocio y usuario creados exitosamente",
@@ -9,10 +9,13 @@ from ..database import get_db
 from ..models.configuration import BusinessConfiguration, Partner
 from ..models.user import User, UserRole
 from ..schemas.configuration import (
-    BusinessConfigurationCreate, BusinessConfigurationUpdate, BusinessConfigurationResponse,
+    BusinessConfigurationCreate, BusinessConfigurationUpdate, BusinessConfigurationResponse, BusinessPricingResponse,
     PartnerCreate, PartnerUpdate, PartnerResponse
 )
-from ..utils.dependencies import get_current_active_admin, check_config_permission
+from ..utils.dependencies import get_current_active_admin, get_current_user, check_config_permission
+from ..utils.business_cache import get_business_settings, invalidate_business_settings
+from ..utils.slug_cache import invalidate_slugs
+from ..utils.catalog_snapshot import invalidate_catalog
 
 router = APIRouter(prefix="/configuration", tags=["configuration"])
 
@@ -68,6 +71,8 @@ def create_business_configuration(
     db.add(new_config)
     db.commit()
     db.refresh(new_config)
+    invalidate_business_settings(new_config.id)
+    invalidate_slugs(new_config.slug)
     return _build_config_response(new_config, db)
 
 
@@ -99,6 +104,7 @@ def update_business_configuration(
         )
     
     update_data = config_update.model_dump(exclude_unset=True)
+    previous_slug = config.slug
     
     # Si se actualiza el nombre y no hay slug, generar uno nuevo
     if 'business_name' in update_data and not config.slug:
@@ -109,9 +115,22 @@ def update_business_configuration(
     
     db.commit()
     db.refresh(config)
+    invalidate_business_settings(config.id)
+    invalidate_slugs(previous_slug, config.slug)
+    invalidate_catalog(config.id)  # El paquete del catálogo incluye la información del negocio
     return _build_config_response(config, db)
 
 
+@router.get("/pricing", response_model=BusinessPricingResponse)
+def get_business_pricing(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Impuesto y moneda del negocio del usuario, para que el punto de venta calcule los mismos totales"""
+    business = get_business_settings(db, current_user.business_id)
+    return BusinessPricingResponse(tax_rate=business.tax_percent, currency=business.currency)
+
+
 @router.get("/qr-code")
 def get_catalog_qr_code(
     db: Session = Depends(get_db),
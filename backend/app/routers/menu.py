@@ -1,16 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import delete
-from typing import List
+from sqlalchemy import case, delete
+from typing import List, Optional
 from ..database import get_db
 from ..models.menu import MenuItem, MenuCategory, menu_item_ingredients
 from ..models.product import Product
 from ..models.user import User
 from ..schemas.menu import (
-    MenuItemCreate, MenuItemUpdate, MenuItemResponse, IngredientItem,
+    MenuItemCreate, MenuItemUpdate, MenuItemResponse, MenuItemMarginResponse, IngredientItem,
     MenuCategoryCreate, MenuCategoryUpdate, MenuCategoryResponse
 )
 from ..utils.dependencies import get_current_user, get_current_active_manager
+from ..utils.recipe_cache import invalidate_recipes
+from ..utils.menu_availability import refresh_portions
+from ..utils.menu_costs import margin, recompute_all_costs, refresh_costs
+from ..utils.catalog_snapshot import invalidate_catalog
 
 router = APIRouter(prefix="/menu", tags=["menu"])
 
@@ -23,6 +27,7 @@ def create_menu_category(
     current_user: User = Depends(get_current_active_manager),
 ):
     db_category = db.query(MenuCategory).filter(
+        MenuCategory.business_id == current_user.business_id,
         MenuCategory.name == category.name,
         MenuCategory.deleted_at.is_(None)  # Solo categorías no eliminadas
     ).first()
@@ -32,9 +37,10 @@ def create_menu_category(
             detail="La categoría del menú ya existe",
         )
     
-    new_category = MenuCategory(**category.model_dump())
+    new_category = MenuCategory(**category.model_dump(), business_id=current_user.business_id)
     db.add(new_category)
     db.commit()
+    invalidate_catalog(current_user.business_id)
     db.refresh(new_category)
     return new_category
 
@@ -47,6 +53,7 @@ def read_menu_categories(
     current_user: User = Depends(get_current_user),
 ):
     categories = db.query(MenuCategory).filter(
+        MenuCategory.business_id == current_user.business_id,
         MenuCategory.deleted_at.is_(None)  # Solo categorías no eliminadas
     ).order_by(MenuCategory.display_order).offset(skip).limit(limit).all()
     return categories
@@ -60,6 +67,7 @@ def update_menu_category(
     current_user: User = Depends(get_current_active_manager),
 ):
     category = db.query(MenuCategory).filter(
+        MenuCategory.business_id == current_user.business_id,
         MenuCategory.id == category_id,
         MenuCategory.deleted_at.is_(None)  # Solo categorías no eliminadas
     ).first()
@@ -71,10 +79,24 @@ def update_menu_category(
     
     update_data = category_update.model_dump(exclude_unset=True)
     
+    if "name" in update_data:
+        duplicate = db.query(MenuCategory.id).filter(
+            MenuCategory.business_id == current_user.business_id,
+            MenuCategory.name == update_data["name"],
+            MenuCategory.id != category_id,
+            MenuCategory.deleted_at.is_(None)
+        ).first()
+        if duplicate:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La categoría del menú ya existe",
+            )
+    
     for field, value in update_data.items():
         setattr(category, field, value)
     
     db.commit()
+    invalidate_catalog(current_user.business_id)
     db.refresh(category)
     return category
 
@@ -88,6 +110,7 @@ def delete_menu_category(
     from datetime import datetime
     
     category = db.query(MenuCategory).filter(
+        MenuCategory.business_id == current_user.business_id,
         MenuCategory.id == category_id,
         MenuCategory.deleted_at.is_(None)  # Solo categorías no eliminadas
     ).first()
@@ -100,19 +123,16 @@ def delete_menu_category(
     # Soft delete: marcar como eliminado con timestamp
     category.deleted_at = datetime.now()
     db.commit()
+    invalidate_catalog(current_user.business_id)
     return None
 
 
 # ITEMS DEL MENÚ (PLATILLOS)
-@router.post("/items", response_model=MenuItemResponse, status_code=status.HTTP_201_CREATED)
-def create_menu_item(
-    menu_item: MenuItemCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_manager),
-):
-    # Verificar que la categoría existe y no está eliminada
-    category = db.query(MenuCategory).filter(
-        MenuCategory.id == menu_item.category_id,
+def _check_category(db: Session, category_id: int, business_id: int) -> None:
+    """404 si la categoría no es del negocio o está eliminada"""
+    category = db.query(MenuCategory.id).filter(
+        MenuCategory.business_id == business_id,
+        MenuCategory.id == category_id,
         MenuCategory.deleted_at.is_(None)  # Solo categorías no eliminadas
     ).first()
     if not category:
@@ -120,24 +140,48 @@ def create_menu_item(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Categoría no encontrada",
         )
+
+
+def _check_ingredient_products(db: Session, ingredients, business_id: int) -> None:
+    """404 si algún ingrediente no es un producto activo del negocio (una sola consulta)"""
+    product_ids = {ingredient.product_id for ingredient in ingredients}
+    if not product_ids:
+        return
+    found = {
+        product_id for (product_id,) in db.query(Product.id).filter(
+            Product.id.in_(product_ids),
+            Product.business_id == business_id,
+            Product.deleted_at.is_(None),
+        )
+    }
+    for ingredient in ingredients:
+        if ingredient.product_id not in found:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Producto con ID {ingredient.product_id} no encontrado",
+            )
+
+
+@router.post("/items", response_model=MenuItemResponse, status_code=status.HTTP_201_CREATED)
+def create_menu_item(
+    menu_item: MenuItemCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_manager),
+):
+    # Verificar que la categoría y los productos de la receta son del negocio
+    _check_category(db, menu_item.category_id, current_user.business_id)
+    if menu_item.ingredients:
+        _check_ingredient_products(db, menu_item.ingredients, current_user.business_id)
     
     # Crear el item sin ingredientes
     item_data = menu_item.model_dump(exclude={'ingredients'})
-    new_item = MenuItem(**item_data)
+    new_item = MenuItem(**item_data, business_id=current_user.business_id)
     db.add(new_item)
     db.flush()  # Para obtener el ID
     
     # Agregar ingredientes
     if menu_item.ingredients:
         for ingredient in menu_item.ingredients:
-            # Verificar que el producto existe
-            product = db.query(Product).filter(Product.id == ingredient.product_id).first()
-            if not product:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Producto con ID {ingredient.product_id} no encontrado",
-                )
-            
             # Insertar en la tabla de relación
             stmt = menu_item_ingredients.insert().values(
                 menu_item_id=new_item.id,
@@ -146,7 +190,11 @@ def create_menu_item(
             )
             db.execute(stmt)
     
+    refresh_portions(db, menu_item_ids=[new_item.id])
+    refresh_costs(db, menu_item_ids=[new_item.id])
     db.commit()
+    invalidate_catalog(current_user.business_id)
+    invalidate_recipes(new_item.id)
     db.refresh(new_item)
     
     # Obtener ingredientes con nombres
@@ -162,7 +210,10 @@ def read_menu_items(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    query = db.query(MenuItem).filter(MenuItem.deleted_at.is_(None))  # Solo items no eliminados
+    query = db.query(MenuItem).filter(
+        MenuItem.business_id == current_user.business_id,
+        MenuItem.deleted_at.is_(None)  # Solo items no eliminados
+    )
     
     if category_id:
         query = query.filter(MenuItem.category_id == category_id)
@@ -170,8 +221,8 @@ def read_menu_items(
     if available_only:
         query = query.filter(MenuItem.is_available == True)
     
-    items = query.offset(skip).limit(limit).all()
-    return [_build_menu_item_response(item, db) for item in items]
+    page = query.order_by(MenuItem.id).offset(skip).limit(limit)
+    return _build_menu_item_responses(page, db)
 
 
 @router.get("/items/featured", response_model=List[MenuItemResponse])
@@ -180,11 +231,62 @@ def read_featured_menu_items(
     current_user: User = Depends(get_current_user),
 ):
     items = db.query(MenuItem).filter(
+        MenuItem.business_id == current_user.business_id,
         MenuItem.is_featured == True,
         MenuItem.is_available == True,
         MenuItem.deleted_at.is_(None)  # Solo items no eliminados
-    ).all()
-    return [_build_menu_item_response(item, db) for item in items]
+    )
+    return _build_menu_item_responses(items, db)
+
+
+@router.get("/items/margins", response_model=List[MenuItemMarginResponse])
+def read_menu_item_margins(
+    max_margin_percent: Optional[float] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_manager),
+):
+    """Reporte de márgenes: platillos con receta, del menos al más rentable"""
+    margin_percent = case(
+        (MenuItem.price > 0, (MenuItem.price - MenuItem.recipe_cost) / MenuItem.price * 100),
+        else_=None,
+    )
+    query = db.query(
+        MenuItem.id, MenuItem.name, MenuItem.category_id, MenuItem.price, MenuItem.recipe_cost
+    ).filter(
+        MenuItem.business_id == current_user.business_id,
+        MenuItem.recipe_cost.isnot(None),
+        MenuItem.deleted_at.is_(None)
+    )
+    if max_margin_percent is not None:
+        query = query.filter(margin_percent <= max_margin_percent)
+    rows = query.order_by(margin_percent, MenuItem.id).offset(skip).limit(limit).all()
+
+    report = []
+    for row in rows:
+        value, percent = margin(row.price, row.recipe_cost)
+        report.append(MenuItemMarginResponse(
+            id=row.id,
+            name=row.name,
+            category_id=row.category_id,
+            price=row.price,
+            recipe_cost=round(row.recipe_cost, 2),
+            margin=value,
+            margin_percent=percent,
+        ))
+    return report
+
+
+@router.post("/items/recompute-costs")
+def recompute_menu_item_costs(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_manager),
+):
+    """Recalcula el costo de todos los platillos en una sola pasada"""
+    updated = recompute_all_costs(db, current_user.business_id)
+    db.commit()
+    return {"updated": updated}
 
 
 @router.get("/items/{item_id}", response_model=MenuItemResponse)
@@ -194,6 +296,7 @@ def read_menu_item(
     current_user: User = Depends(get_current_user),
 ):
     item = db.query(MenuItem).filter(
+        MenuItem.business_id == current_user.business_id,
         MenuItem.id == item_id,
         MenuItem.deleted_at.is_(None)  # Solo items no eliminados
     ).first()
@@ -213,6 +316,7 @@ def update_menu_item(
     current_user: User = Depends(get_current_active_manager),
 ):
     item = db.query(MenuItem).filter(
+        MenuItem.business_id == current_user.business_id,
         MenuItem.id == item_id,
         MenuItem.deleted_at.is_(None)  # Solo items no eliminados
     ).first()
@@ -224,9 +328,19 @@ def update_menu_item(
     
     update_data = item_update.model_dump(exclude_unset=True, exclude={'ingredients'})
     
+    # La nueva categoría y los productos de la receta deben ser del negocio
+    if update_data.get("category_id") not in (None, item.category_id):
+        _check_category(db, update_data["category_id"], current_user.business_id)
+    if item_update.ingredients:
+        _check_ingredient_products(db, item_update.ingredients, current_user.business_id)
+    
     for field, value in update_data.items():
         setattr(item, field, value)
     
+    # La disponibilidad elegida por el gerente prevalece sobre la automática
+    if "is_available" in update_data:
+        item.auto_disabled = False
+    
     # Actualizar ingredientes si se proporcionan
     if item_update.ingredients is not None:
         # Eliminar ingredientes existentes
@@ -240,8 +354,13 @@ def update_menu_item(
                 quantity=ingredient.quantity
             )
             db.execute(stmt)
+        refresh_portions(db, menu_item_ids=[item_id])
+        refresh_costs(db, menu_item_ids=[item_id])
     
     db.commit()
+    invalidate_catalog(current_user.business_id)
+    if item_update.ingredients is not None:
+        invalidate_recipes(item_id)
     db.refresh(item)
     return _build_menu_item_response(item, db)
 
@@ -255,6 +374,7 @@ def delete_menu_item(
     from datetime import datetime
     
     item = db.query(MenuItem).filter(
+        MenuItem.business_id == current_user.business_id,
         MenuItem.id == item_id,
         MenuItem.deleted_at.is_(None)  # Solo items no eliminados
     ).first()
@@ -267,26 +387,52 @@ def delete_menu_item(
     # Soft delete: marcar como eliminado con timestamp
     item.deleted_at = datetime.now()
     db.commit()
+    invalidate_catalog(current_user.business_id)
+    invalidate_recipes(item_id)
     return None
 
 
 # Helper function para construir respuesta con ingredientes
 def _build_menu_item_response(item: MenuItem, db: Session) -> MenuItemResponse:
-    # Obtener ingredientes con sus cantidades
-    ingredients_data = db.execute(
-        menu_item_ingredients.select().where(menu_item_ingredients.c.menu_item_id == item.id)
-    ).fetchall()
+    return _build_menu_item_responses(db.query(MenuItem).filter(MenuItem.id == item.id), db)[0]
+
+
+def _build_menu_item_responses(query, db: Session) -> List[MenuItemResponse]:
+    """
+    Respuestas de los platillos de `query` (con sus filtros y paginación) en una
+    sola consulta: menu_items + menu_item_ingredients + products
+    """
+    page = query.with_entities(MenuItem.id).subquery()
+    rows = db.query(
+        MenuItem,
+        menu_item_ingredients.c.product_id,
+        menu_item_ingredients.c.quantity,
+        Product.name,
+    ).join(
+        page, page.c.id == MenuItem.id
+    ).outerjoin(
+        menu_item_ingredients, menu_item_ingredients.c.menu_item_id == MenuItem.id
+    ).outerjoin(
+        Product, Product.id == menu_item_ingredients.c.product_id
+    ).order_by(MenuItem.id).all()
     
-    ingredients = []
-    for ing_data in ingredients_data:
-        product = db.query(Product).filter(Product.id == ing_data.product_id).first()
-        if product:
-            ingredients.append(IngredientItem(
-                product_id=ing_data.product_id,
-                quantity=ing_data.quantity,
-                product_name=product.name
+    items = {}
+    ingredients = {}
+    for item, product_id, quantity, product_name in rows:
+        items[item.id] = item
+        ingredients.setdefault(item.id, [])
+        if product_name is not None:  # Ingrediente con producto existente
+            ingredients[item.id].append(IngredientItem(
+                product_id=product_id,
+                quantity=quantity,
+                product_name=product_name
             ))
     
+    return [_menu_item_response(item, ingredients[item.id]) for item in items.values()]
+
+
+def _menu_item_response(item: MenuItem, ingredients: List[IngredientItem]) -> MenuItemResponse:
+    item_margin, item_margin_percent = margin(item.price, item.recipe_cost)
     return MenuItemResponse(
         id=item.id,
         name=item.name,
@@ -296,6 +442,10 @@ def _build_menu_item_response(item: MenuItem, db: Session) -> MenuItemResponse:
         preparation_time=item.preparation_time,
         is_available=item.is_available,
         is_featured=item.is_featured,
+        portions_available=item.portions_available,
+        recipe_cost=item.recipe_cost,
+        margin=item_margin,
+        margin_percent=item_margin_percent,
         image_url=item.image_url,
         created_at=item.created_at,
         updated_at=item.updated_at,
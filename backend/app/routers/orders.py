@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, case, func, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime
+import asyncio
+import base64
+import json
 from ..database import get_db
-from ..models.order import Order, OrderItem, OrderStatus
+from ..models.order import ACTIVE_ORDER_STATUSES, Order, OrderStatus, PaymentStatus
 from ..models.order_payment import OrderPayment
 from ..models.payment_method import PaymentMethod
-from ..models.product import Product
-from ..models.menu import MenuItem
 from ..models.table import Table, TableStatus
 from ..models.user import User
 from ..schemas.order import (
@@ -16,151 +20,156 @@ from ..schemas.order import (
     OrderResponse,
     AddPaymentsToOrder,
     UpdateOrderItems,
+    OrderSummaryResponse,
+    OrderBulkStatusUpdate,
+    OrderBulkStatusSkipped,
+    OrderBulkStatusResponse,
+    OrderSyncBatch,
+    OrderSyncResult,
+    OrderSyncResponse,
+)
+from ..utils.dependencies import get_current_user, get_current_active_chef, get_current_stream_user
+from ..utils.order_pricing import (
+    load_order_catalog,
+    build_order_items,
+    line_source,
+    stock_demand,
+    source_demand,
+    shortage_detail,
+)
+from ..utils.stock import reserve_stock, release_stock
+from ..utils.order_events import broadcast, order_event_loader, order_events
+from ..utils.outbox import enqueue, outbox_handler
+from ..utils.business_cache import get_business_settings
+from ..utils.idempotency import (
+    claim_idempotency_key,
+    complete_idempotency_key,
+    find_idempotency_keys,
+    store_idempotency_key,
+    request_hash,
 )
-from ..utils.dependencies import get_current_user, get_current_active_chef
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
+# Columnas del listado liviano (GET /orders/summary)
+SUMMARY_COLUMNS = (
+    Order.id, Order.table_id, Order.status, Order.payment_status, Order.total, Order.created_at,
+)
+SYNC_CHUNK_SIZE = 100  # Órdenes confirmadas por transacción en la sincronización
 
-@router.post("/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
-def create_order(
-    order_data: OrderCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    # Verificar que la mesa existe y está disponible (si se especifica)
-    if order_data.table_id:
-        table = db.query(Table).filter(Table.id == order_data.table_id).first()
-        if not table:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Mesa no encontrada"
-            )
-        # Actualizar estado de la mesa
-        table.status = TableStatus.OCCUPIED
-
-    # Crear la orden
-    new_order = Order(
-        table_id=order_data.table_id,
-        user_id=current_user.id,
-        notes=order_data.notes,
-        status=OrderStatus.PENDING.value,
-    )
 
-    subtotal = 0
+# Items, pagos y métodos de pago que se precargan para OrderResponse
+ORDER_RELATIONS = (
+    selectinload(Order.items),
+    selectinload(Order.payments).selectinload(OrderPayment.payment_method),
+)
 
-    # Crear items de la orden
-    for item_data in order_data.items:
-        # Determinar si es producto directo o menu item
-        if item_data.source_type == "menu" and item_data.menu_item_id:
-            # Item del menú
-            menu_item = (
-                db.query(MenuItem).filter(MenuItem.id == item_data.menu_item_id).first()
-            )
-            if not menu_item:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Item de menú con ID {item_data.menu_item_id} no encontrado",
-                )
 
-            if not menu_item.is_available:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"El item '{menu_item.name}' no está disponible",
-                )
+def _orders_query(db: Session, business_id: Optional[int]):
+    """Consulta de órdenes del negocio con sus relaciones precargadas"""
+    return db.query(Order).options(*ORDER_RELATIONS).filter(Order.business_id == business_id)
 
-            # Verificar que haya suficientes ingredientes
-            for ingredient in menu_item.ingredients:
-                # Obtener la cantidad necesaria del ingrediente desde la tabla de relación
-                from sqlalchemy import select
-                from ..models.menu import menu_item_ingredients
 
-                stmt = select(menu_item_ingredients.c.quantity).where(
-                    menu_item_ingredients.c.menu_item_id == menu_item.id,
-                    menu_item_ingredients.c.product_id == ingredient.id,
-                )
-                result = db.execute(stmt).first()
-                ingredient_qty = result[0] if result else 0
+def _load_order(db: Session, order_id: int) -> Order:
+    """Recarga una orden recién confirmada con sus relaciones para la respuesta"""
+    return db.query(Order).options(*ORDER_RELATIONS).populate_existing().filter(Order.id == order_id).first()
 
-                required_qty = ingredient_qty * item_data.quantity
 
-                if ingredient.stock < required_qty:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Stock insuficiente del ingrediente '{ingredient.name}' para '{menu_item.name}'",
-                    )
-
-            # Calcular subtotal con precio del menu
-            item_subtotal = menu_item.price * item_data.quantity
-            subtotal += item_subtotal
-
-            # Crear order item
-            order_item = OrderItem(
-                menu_item_id=item_data.menu_item_id,
-                source_type="menu",
-                quantity=item_data.quantity,
-                unit_price=menu_item.price,
-                subtotal=item_subtotal,
-                notes=item_data.notes,
-            )
-            new_order.items.append(order_item)
+def _apply_order_filters(
+    query,
+    status_filter: Optional[OrderStatus] = None,
+    payment_status: Optional[PaymentStatus] = None,
+    table_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+):
+    """Filtros del listado de órdenes (cada uno respaldado por un índice compuesto)"""
+    if status_filter:
+        query = query.filter(Order.status == status_filter.value)
+    if payment_status:
+        query = query.filter(Order.payment_status == payment_status.value)
+    if table_id:
+        query = query.filter(Order.table_id == table_id)
+    if user_id:
+        query = query.filter(Order.user_id == user_id)
+    if date_from:
+        query = query.filter(Order.created_at >= date_from)
+    if date_to:
+        query = query.filter(Order.created_at < date_to)
+    return query
+
+
+def _page_orders(query, cursor: Optional[str], skip: int, limit: int):
+    """Ordena por (created_at, id) descendente y aplica el cursor (o skip si no hay cursor)"""
+    query = query.order_by(Order.created_at.desc(), Order.id.desc())
+    if cursor:
+        created_at, order_id = _decode_cursor(cursor)
+        query = query.filter(tuple_(Order.created_at, Order.id) < (created_at, order_id))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def _encode_cursor(order) -> str:
+    """Cursor opaco con la posición (created_at, id) de la última orden de la página"""
+    raw = f"{order.created_at.isoformat()}|{order.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        created_at, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(order_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido"
+        )
 
-            # Reducir stock de ingredientes
-            for ingredient in menu_item.ingredients:
-                from sqlalchemy import select
-                from ..models.menu import menu_item_ingredients
 
-                stmt = select(menu_item_ingredients.c.quantity).where(
-                    menu_item_ingredients.c.menu_item_id == menu_item.id,
-                    menu_item_ingredients.c.product_id == ingredient.id,
-                )
-                result = db.execute(stmt).first()
-                ingredient_qty = result[0] if result else 0
+def _active_payment_method_ids(db: Session, payments) -> Set[int]:
+    """IDs activos entre los métodos de pago referenciados (una sola consulta)"""
+    method_ids = {payment.payment_method_id for payment in payments}
+    if not method_ids:
+        return set()
 
-                ingredient.stock -= ingredient_qty * item_data.quantity
+    return {
+        method_id
+        for (method_id,) in db.query(PaymentMethod.id).filter(
+            PaymentMethod.id.in_(method_ids),
+            PaymentMethod.is_active == True,
+        )
+    }
 
-        else:
-            # Producto directo del inventario
-            if not item_data.product_id:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Debe proporcionar product_id o menu_item_id",
-                )
 
-            product = (
-                db.query(Product).filter(Product.id == item_data.product_id).first()
+def _check_payment_methods(payments, active_ids: Set[int]) -> None:
+    """Verifica que todos los métodos de pago existan y estén activos"""
+    for payment in payments:
+        if payment.payment_method_id not in active_ids:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Método de pago con ID {payment.payment_method_id} no encontrado o inactivo",
             )
-            if not product:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Producto con ID {item_data.product_id} no encontrado",
-                )
 
-            # Verificar stock
-            if product.stock < item_data.quantity:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Stock insuficiente para {product.name}",
-                )
-
-            item_subtotal = product.sale_price * item_data.quantity
-            subtotal += item_subtotal
 
-            order_item = OrderItem(
-                product_id=item_data.product_id,
-                source_type="product",
-                quantity=item_data.quantity,
-                unit_price=product.sale_price,
-                subtotal=item_subtotal,
-                notes=item_data.notes,
-            )
-            new_order.items.append(order_item)
+def _build_order(
+    order_data: OrderCreate, catalog, active_method_ids: Set[int], tax_rate: float, current_user: User
+) -> Tuple[Order, Dict[int, float]]:
+    """Arma la orden en memoria (items, totales y pagos). Retorna (orden, demanda de stock)"""
+    new_order = Order(
+        table_id=order_data.table_id,
+        user_id=current_user.id,
+        business_id=current_user.business_id,
+        notes=order_data.notes,
+        status=OrderStatus.PENDING.value,
+    )
 
-            # Reducir stock
-            product.stock -= item_data.quantity
+    order_items, subtotal = build_order_items(catalog, order_data.items)
+    new_order.items.extend(order_items)
 
-    # Calcular totales (IVA del 16% como ejemplo)
+    # Calcular totales con la tasa de impuesto del negocio
     new_order.subtotal = subtotal
-    new_order.tax = subtotal * 0.16
+    new_order.tax = subtotal * tax_rate
     new_order.total = subtotal + new_order.tax
 
     # Validar y crear pagos (si se especifican)
@@ -176,24 +185,8 @@ def create_order(
                 detail=f"La suma de los pagos (${total_pagado:.2f}) no coincide con el total de la orden (${new_order.total:.2f})",
             )
 
-    # Crear los pagos si existen
+    _check_payment_methods(order_data.payments, active_method_ids)
     for payment_data in order_data.payments:
-        # Verificar que el método de pago existe
-        payment_method = (
-            db.query(PaymentMethod)
-            .filter(
-                PaymentMethod.id == payment_data.payment_method_id,
-                PaymentMethod.is_active == True,
-            )
-            .first()
-        )
-
-        if not payment_method:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Método de pago con ID {payment_data.payment_method_id} no encontrado o inactivo",
-            )
-
         order_payment = OrderPayment(
             payment_method_id=payment_data.payment_method_id,
             amount=payment_data.amount,
@@ -210,46 +203,515 @@ def create_order(
     else:
         new_order.payment_status = "pending"
 
+    return new_order, stock_demand(catalog, order_data.items)
+
+
+def _order_response(db: Session, order_id: int) -> OrderResponse:
+    """Respuesta de la orden con sus relaciones precargadas"""
+    return OrderResponse.model_validate(_load_order(db, order_id))
+
+
+def _enqueue_order_event(db: Session, current_user: User, event_type: str, order_id: int) -> None:
+    """Registra el evento para las pantallas de cocina (se publica desde la outbox)"""
+    enqueue(db, current_user.business_id, event_type, {"order_id": order_id})
+
+
+def _enqueue_table(db: Session, current_user: User, event_type: str, table_id: Optional[int]) -> None:
+    """Registra la ocupación o liberación de la mesa (se aplica desde la outbox)"""
+    if table_id:
+        enqueue(db, current_user.business_id, event_type, {"table_id": table_id})
+
+
+def _status_event(order) -> dict:
+    """Campos de estado de la orden (acepta la entidad o una fila de RETURNING)"""
+    return {
+        "id": order.id,
+        "table_id": order.table_id,
+        "status": order.status,
+        "payment_status": order.payment_status,
+        "total": order.total,
+    }
+
+
+@outbox_handler("order_created", "order_items_changed", "order_status_changed", "order_deleted")
+def _deliver_order_events(db: Session, rows) -> None:
+    """Envía los eventos de un lote de la outbox a todos los procesos (solo ids de orden)"""
+    events: Dict[Optional[int], list] = {}
+    for row in rows:
+        events.setdefault(row.business_id, []).append((row.event_type, json.loads(row.payload)["order_id"]))
+
+    for business_id, business_events in events.items():
+        broadcast(db, business_id, business_events)
+
+
+@order_event_loader
+def _load_order_events(db: Session, events: List[Tuple[str, int]]) -> List[Tuple[str, dict]]:
+    """Datos de los eventos de un aviso con una sola carga de órdenes"""
+    order_ids = {order_id for event_type, order_id in events if event_type != "order_deleted"}
+    orders = {}
+    if order_ids:
+        orders = {order.id: order for order in db.query(Order).options(*ORDER_RELATIONS).filter(Order.id.in_(order_ids))}
+
+    loaded = []
+    for event_type, order_id in events:
+        if event_type == "order_deleted":
+            data = {"id": order_id}
+        else:
+            order = orders.get(order_id)
+            if order is None:
+                continue  # Eliminada o archivada antes de publicar
+            if event_type == "order_status_changed":
+                data = _status_event(order)
+            else:
+                data = OrderResponse.model_validate(order).model_dump(mode="json")
+        loaded.append((event_type, data))
+    return loaded
+
+
+@outbox_handler("table_occupied", "table_released")
+def _apply_table_changes(db: Session, rows) -> None:
+    """Aplica en dos UPDATE el último cambio de cada mesa del lote"""
+    final_state = {}
+    for row in rows:
+        final_state[json.loads(row.payload)["table_id"]] = row.event_type
+
+    occupied = {table_id for table_id, event_type in final_state.items() if event_type == "table_occupied"}
+    released = final_state.keys() - occupied
+    if occupied:
+        db.execute(
+            update(Table)
+            .where(Table.id.in_(occupied))
+            .values(status=TableStatus.OCCUPIED)
+            .execution_options(synchronize_session=False)
+        )
+    if released:
+        # No liberar una mesa que ya tiene otra orden activa
+        active_order = (
+            select(Order.id)
+            .where(
+                Order.table_id == Table.id,
+                Order.status.in_(ACTIVE_ORDER_STATUSES),
+            )
+            .exists()
+        )
+        db.execute(
+            update(Table)
+            .where(Table.id.in_(released), ~active_order)
+            .values(status=TableStatus.AVAILABLE)
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def _event_stream(request: Request, business_id: Optional[int], last_event_id: Optional[str]):
+    """Genera los eventos SSE del negocio, con keepalive cada 15 segundos"""
+    subscriber, backlog, reset = order_events.subscribe(business_id, last_event_id)
+    _, queue = subscriber
+    try:
+        if reset:
+            yield "event: reset\ndata: {}\n\n"
+        for event in backlog:
+            yield _format_event(event)
+
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=15)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield _format_event(event)
+    finally:
+        order_events.unsubscribe(business_id, subscriber)
+
+
+def _format_event(event) -> str:
+    sequence, event_type, data = event
+    return f"id: {order_events.event_id(sequence)}\nevent: {event_type}\ndata: {data}\n\n"
+
+
+def _sync_duplicate(order_data, previous, fingerprint: str) -> OrderSyncResult:
+    """Resultado para una orden que ya se sincronizó en un lote anterior"""
+    if previous.request_hash != fingerprint:
+        return OrderSyncResult(
+            client_id=order_data.client_id,
+            status="error",
+            detail="El client_id ya se usó con una orden diferente",
+        )
+    original = OrderSyncResult.model_validate_json(previous.response_body)
+    return original.model_copy(update={"status": "duplicate"})
+
+
+def _sync_repeated(client_id: str, results: Dict[str, OrderSyncResult]) -> OrderSyncResult:
+    """Resultado para un client_id repetido dentro del mismo lote"""
+    original = results[client_id]
+    if original.status != "created":
+        return original.model_copy()
+    return original.model_copy(update={"status": "duplicate"})
+
+
+def _commit_sync_chunk(db: Session, accepted, current_user: User) -> Optional[List[int]]:
+    """
+    Confirma un bloque de órdenes sincronizadas: stock, mesas y claves en una transacción.
+    Retorna None si se confirmó; si no, revierte y retorna los productos sin stock
+    (lista vacía si otro dispositivo sincronizó las mismas órdenes al mismo tiempo).
+    """
+    chunk_demand = {}
+    for *_, demand in accepted:
+        for product_id, qty in demand.items():
+            chunk_demand[product_id] = chunk_demand.get(product_id, 0) + qty
+
+    try:
+        _, failed = reserve_stock(db, chunk_demand)
+        if not failed:
+            db.add_all(new_order for _, new_order, _, _, _ in accepted)
+            db.flush()
+            for table_id in {new_order.table_id for _, new_order, _, _, _ in accepted}:
+                _enqueue_table(db, current_user, "table_occupied", table_id)
+            for order_data, new_order, fingerprint, result, _ in accepted:
+                result.order_id = new_order.id
+                store_idempotency_key(
+                    db, order_data.client_id, current_user.business_id, "orders.sync", fingerprint, result
+                )
+                _enqueue_order_event(db, current_user, "order_created", new_order.id)
+            db.commit()
+            return None
+    except IntegrityError:
+        failed = []
+
+    db.rollback()
+    for _, new_order, _, result, _ in accepted:
+        new_order.id = None
+        result.order_id = None
+    return failed
+
+
+def _commit_sync_orders(db: Session, catalog, accepted, available: Dict[int, float], current_user: User) -> None:
+    """
+    Confirma las órdenes aceptadas; si el stock real ya no alcanza (otro dispositivo
+    vendió mientras tanto) reintenta por mitades hasta aislar las órdenes que fallan.
+    Al fallar una orden su demanda vuelve a `available` para las órdenes siguientes.
+    """
+    failed = _commit_sync_chunk(db, accepted, current_user)
+    if failed is None:
+        return
+
+    if len(accepted) > 1:
+        middle = len(accepted) // 2
+        _commit_sync_orders(db, catalog, accepted[:middle], available, current_user)
+        _commit_sync_orders(db, catalog, accepted[middle:], available, current_user)
+        return
+
+    order_data, _, _, result, demand = accepted[0]
+    for product_id, qty in demand.items():
+        available[product_id] = available.get(product_id, 0) + qty
+    result.status = "error"
+    if failed:
+        result.detail = shortage_detail(catalog, failed[0], order_data.items)
+    else:
+        result.detail = "La orden se sincronizó al mismo tiempo desde otro dispositivo, reintente"
+
+
+def _line_key(line):
+    """Identidad de una línea para comparar items: (source_type, id, notas)"""
+    source = line_source(line) or (line.source_type, None)
+    return source + (line.notes or None,)
+
+
+def _reserve_or_fail(db: Session, catalog, demand, lines) -> None:
+    """Reserva stock de forma atómica; si algún producto no alcanza revierte y responde 400"""
+    _, failed = reserve_stock(db, demand)
+    if failed:
+        detail = shortage_detail(catalog, failed[0], lines)
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+@router.post("/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
+def create_order(
+    order_data: OrderCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # Un reintento con la misma Idempotency-Key recibe la respuesta original sin tocar stock
+    idempotency, replay = claim_idempotency_key(
+        db, idempotency_key, current_user.business_id, "orders.create", request_hash(order_data)
+    )
+    if replay:
+        return replay
+
+    # Verificar que la mesa existe (si se especifica); se marca ocupada desde la outbox
+    if order_data.table_id:
+        table = db.query(Table.id).filter(Table.id == order_data.table_id).first()
+        if not table:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Mesa no encontrada"
+            )
+
+    # Valorizar items y reservar stock (consultas en lote por tipo de entidad)
+    catalog = load_order_catalog(db, order_data.items, current_user.business_id)
+    active_method_ids = _active_payment_method_ids(db, order_data.payments)
+    tax_rate = get_business_settings(db, current_user.business_id).tax_rate
+    new_order, demand = _build_order(order_data, catalog, active_method_ids, tax_rate, current_user)
+    _reserve_or_fail(db, catalog, demand, order_data.items)
+
     db.add(new_order)
+    db.flush()
+    _enqueue_table(db, current_user, "table_occupied", new_order.table_id)
+    _enqueue_order_event(db, current_user, "order_created", new_order.id)
+    response = _order_response(db, new_order.id)
+    complete_idempotency_key(idempotency, response, status.HTTP_201_CREATED)
     db.commit()
-    db.refresh(new_order)
-
-    # Agregar nombres de métodos de pago a la respuesta
-    for payment in new_order.payments:
-        payment_method = (
-            db.query(PaymentMethod)
-            .filter(PaymentMethod.id == payment.payment_method_id)
-            .first()
-        )
-        if payment_method:
-            payment.payment_method_name = payment_method.name
+    return response
+
+
+@router.post("/sync", response_model=OrderSyncResponse)
+def sync_orders(
+    batch: OrderSyncBatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Sincronizar en lote las órdenes tomadas sin conexión (kioscos).
+    Se procesan en el orden recibido y cada una responde created, duplicate o error.
+    Todo el lote se valoriza con consultas en lote y el stock se aplica con una
+    transacción por bloque de SYNC_CHUNK_SIZE órdenes.
+    """
+    business_id = current_user.business_id
+    orders_data = batch.orders
+    # El catálogo cargado se reutiliza entre las transacciones de cada bloque
+    db.expire_on_commit = False
+
+    catalog = load_order_catalog(
+        db, [line for order in orders_data for line in order.items], business_id
+    )
+    active_method_ids = _active_payment_method_ids(
+        db, [payment for order in orders_data for payment in order.payments]
+    )
+    table_ids = {order.table_id for order in orders_data if order.table_id}
+    existing_table_ids = {
+        table_id for (table_id,) in db.query(Table.id).filter(Table.id.in_(table_ids))
+    } if table_ids else set()
+    tax_rate = get_business_settings(db, business_id).tax_rate
+    synced = find_idempotency_keys(db, (order.client_id for order in orders_data), business_id, "orders.sync")
+
+    # Stock disponible en memoria para validar el lote completo en orden
+    available = {product_id: product.stock or 0 for product_id, product in catalog.products.items()}
+    results: Dict[str, OrderSyncResult] = {}
+    ordered_results = []
+
+    for start in range(0, len(orders_data), SYNC_CHUNK_SIZE):
+        accepted = []
+
+        for order_data in orders_data[start:start + SYNC_CHUNK_SIZE]:
+            fingerprint = request_hash(order_data)
+            if order_data.client_id in synced:
+                ordered_results.append(_sync_duplicate(order_data, synced[order_data.client_id], fingerprint))
+                continue
+            if order_data.client_id in results:
+                # Repetida dentro del mismo lote: se resuelve al final, cuando ya tiene order_id
+                ordered_results.append(order_data.client_id)
+                continue
+
+            try:
+                if order_data.table_id and order_data.table_id not in existing_table_ids:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND, detail="Mesa no encontrada"
+                    )
+                new_order, demand = _build_order(order_data, catalog, active_method_ids, tax_rate, current_user)
+                short = [pid for pid, qty in demand.items() if qty > available.get(pid, 0)]
+                if short:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=shortage_detail(catalog, short[0], order_data.items),
+                    )
+            except HTTPException as exc:
+                result = OrderSyncResult(client_id=order_data.client_id, status="error", detail=exc.detail)
+                results[order_data.client_id] = result
+                ordered_results.append(result)
+                continue
+
+            if order_data.created_at:
+                new_order.created_at = order_data.created_at
+            for product_id, qty in demand.items():
+                available[product_id] = available.get(product_id, 0) - qty
+
+            result = OrderSyncResult(client_id=order_data.client_id, status="created")
+            results[order_data.client_id] = result
+            ordered_results.append(result)
+            accepted.append((order_data, new_order, fingerprint, result, demand))
+
+        if accepted:
+            _commit_sync_orders(db, catalog, accepted, available, current_user)
 
-    return new_order
+    return OrderSyncResponse(results=[
+        _sync_repeated(result, results) if isinstance(result, str) else result
+        for result in ordered_results
+    ])
 
 
 @router.get("/", response_model=List[OrderResponse])
 def read_orders(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en X-Next-Cursor"),
+    status_filter: Optional[OrderStatus] = Query(None, alias="status"),
+    payment_status: Optional[PaymentStatus] = None,
+    table_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_chef),  # Chef puede ver órdenes
 ):
-    orders = db.query(Order).offset(skip).limit(limit).all()
-
-    # Agregar nombres de métodos de pago
-    for order in orders:
-        for payment in order.payments:
-            payment_method = (
-                db.query(PaymentMethod)
-                .filter(PaymentMethod.id == payment.payment_method_id)
-                .first()
-            )
-            if payment_method:
-                payment.payment_method_name = payment_method.name
+    """
+    Listar órdenes de la más reciente a la más antigua.
+    Paginación por cursor sobre (created_at, id): usar el valor de X-Next-Cursor
+    como ?cursor= para la página siguiente (skip se mantiene por compatibilidad).
+    """
+    query = _apply_order_filters(
+        _orders_query(db, current_user.business_id), status_filter, payment_status, table_id, user_id, date_from, date_to
+    )
+    orders = _page_orders(query, cursor, skip, limit).all()
 
+    if len(orders) == limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor(orders[-1])
     return orders
 
 
+@router.get("/summary", response_model=List[OrderSummaryResponse])
+def read_orders_summary(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en X-Next-Cursor"),
+    status_filter: Optional[OrderStatus] = Query(None, alias="status"),
+    payment_status: Optional[PaymentStatus] = None,
+    table_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_chef),
+):
+    """
+    Listado liviano de órdenes (caja y vista de salón): solo id, mesa, estados,
+    total y fecha. Mismos filtros y cursor que GET /orders, pero selecciona solo
+    esas columnas y serializa directo desde las filas, sin entidades ni relaciones.
+    """
+    query = _apply_order_filters(
+        db.query(*SUMMARY_COLUMNS).filter(Order.business_id == current_user.business_id), status_filter, payment_status, table_id, user_id, date_from, date_to
+    )
+    rows = _page_orders(query, cursor, skip, limit).all()
+
+    content = json.dumps([
+        {
+            "id": row.id,
+            "table_id": row.table_id,
+            "status": row.status,
+            "payment_status": row.payment_status,
+            "total": row.total,
+            "created_at": row.created_at.isoformat(),
+        }
+        for row in rows
+    ])
+    response = Response(content=content, media_type="application/json")
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1])
+    return response
+
+
+@router.get("/stream")
+async def stream_orders(
+    request: Request,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_stream_user),
+):
+    """
+    Eventos en vivo de órdenes del negocio (Server-Sent Events) para pantallas de cocina.
+    Eventos: order_created, order_items_changed, order_status_changed, order_deleted
+    y reset (el cliente debe recargar la lista completa).
+    Autenticación con Bearer o con ?access_token= (EventSource no envía encabezados).
+    Reanuda desde el encabezado Last-Event-ID que envía EventSource al reconectar.
+    """
+    await get_current_active_chef(current_user)
+    business_id = current_user.business_id
+    # Liberar la conexión a la base de datos: el stream puede durar horas
+    db.close()
+
+    return StreamingResponse(
+        _event_stream(request, business_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/bulk-status", response_model=OrderBulkStatusResponse)
+def update_orders_status(
+    bulk_update: OrderBulkStatusUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Cambiar el estado de varias órdenes a la vez (pantalla de cocina).
+    Un solo UPDATE con las mismas reglas de PUT /orders/{id}: las órdenes canceladas
+    no se reabren y la mesa solo se libera si la orden se completa y está pagada.
+    Mesas y eventos se procesan en lote desde la outbox.
+    """
+    target = bulk_update.status.value
+    order_ids = set(bulk_update.order_ids)
+    completes_paid = and_(
+        target == OrderStatus.COMPLETED.value, Order.payment_status == "paid"
+    )
+
+    rows = db.execute(
+        update(Order)
+        .where(
+            Order.id.in_(order_ids),
+            Order.business_id == current_user.business_id,
+            Order.status != OrderStatus.CANCELLED.value,
+            Order.status != target,
+        )
+        .values(
+            status=target,
+            paid_at=case((completes_paid, func.now()), else_=Order.paid_at),
+        )
+        .returning(Order.id, Order.table_id, Order.status, Order.payment_status, Order.total)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    # Las mesas de las órdenes completadas y pagadas se liberan en lote desde la outbox
+    released_table_ids = {
+        row.table_id for row in rows
+        if row.table_id and target == OrderStatus.COMPLETED.value and row.payment_status == "paid"
+    }
+    for table_id in released_table_ids:
+        _enqueue_table(db, current_user, "table_released", table_id)
+    for row in rows:
+        _enqueue_order_event(db, current_user, "order_status_changed", row.id)
+    db.commit()
+
+    updated = [row.id for row in rows]
+    skipped_ids = order_ids.difference(updated)
+    skipped = []
+    if skipped_ids:
+        current = dict(
+            db.query(Order.id, Order.status).filter(
+                Order.id.in_(skipped_ids), Order.business_id == current_user.business_id
+            )
+        )
+        for order_id in sorted(skipped_ids):
+            if order_id not in current:
+                detail = "Orden no encontrada"
+            elif current[order_id] == OrderStatus.CANCELLED.value and target != current[order_id]:
+                detail = "No se puede reabrir una orden cancelada"
+            else:
+                detail = f"La orden ya está en estado {target}"
+            skipped.append(OrderBulkStatusSkipped(id=order_id, detail=detail))
+
+    return OrderBulkStatusResponse(updated=updated, skipped=skipped)
+
+
 @router.get("/table/{table_id}", response_model=OrderResponse)
 def get_order_by_table(
     table_id: int,
@@ -259,11 +721,12 @@ def get_order_by_table(
     """Obtener la orden activa de una mesa específica"""
     # Buscar orden activa (no completada ni cancelada) de la mesa
     order = (
-        db.query(Order)
+        _orders_query(db, current_user.business_id)
         .filter(
             Order.table_id == table_id,
-            Order.status.in_([OrderStatus.PENDING.value, OrderStatus.PREPARING.value]),
+            Order.status.in_(ACTIVE_ORDER_STATUSES),
         )
+        .order_by(Order.created_at.desc())
         .first()
     )
 
@@ -273,16 +736,6 @@ def get_order_by_table(
             detail="No hay orden activa para esta mesa",
         )
 
-    # Agregar nombres de métodos de pago
-    for payment in order.payments:
-        payment_method = (
-            db.query(PaymentMethod)
-            .filter(PaymentMethod.id == payment.payment_method_id)
-            .first()
-        )
-        if payment_method:
-            payment.payment_method_name = payment_method.name
-
     return order
 
 
@@ -292,22 +745,12 @@ def read_order(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_chef),  # Chef puede ver órdenes
 ):
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = _orders_query(db, current_user.business_id).filter(Order.id == order_id).first()
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Orden no encontrada"
         )
 
-    # Agregar nombres de métodos de pago
-    for payment in order.payments:
-        payment_method = (
-            db.query(PaymentMethod)
-            .filter(PaymentMethod.id == payment.payment_method_id)
-            .first()
-        )
-        if payment_method:
-            payment.payment_method_name = payment_method.name
-
     return order
 
 
@@ -318,7 +761,9 @@ def update_order(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = db.query(Order).filter(
+        Order.id == order_id, Order.business_id == current_user.business_id
+    ).first()
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Orden no encontrada"
@@ -326,6 +771,16 @@ def update_order(
 
     update_data = order_update.model_dump(exclude_unset=True)
 
+    # Una orden cancelada no se reabre (misma regla que POST /orders/bulk-status)
+    if (
+        order.status == OrderStatus.CANCELLED.value
+        and update_data.get("status", OrderStatus.CANCELLED.value) != OrderStatus.CANCELLED.value
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No se puede reabrir una orden cancelada",
+        )
+
     # Si se actualiza el descuento, recalcular total
     if "discount" in update_data:
         order.discount = update_data["discount"]
@@ -338,18 +793,16 @@ def update_order(
     ):
         order.paid_at = datetime.utcnow()
         # Liberar la mesa si tiene una asignada
-        if order.table_id:
-            table = db.query(Table).filter(Table.id == order.table_id).first()
-            if table:
-                table.status = TableStatus.AVAILABLE
+        _enqueue_table(db, current_user, "table_released", order.table_id)
 
     for field, value in update_data.items():
         if field != "discount":  # Ya manejado arriba
             setattr(order, field, value)
 
+    if "status" in update_data or "discount" in update_data:
+        _enqueue_order_event(db, current_user, "order_status_changed", order.id)
     db.commit()
-    db.refresh(order)
-    return order
+    return _load_order(db, order.id)
 
 
 @router.put("/{order_id}/items", response_model=OrderResponse)
@@ -360,7 +813,11 @@ def update_order_items(
     current_user: User = Depends(get_current_user),
 ):
     """Actualizar items de una orden existente (agregar/quitar productos)"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    # Bloquear la orden: dos ediciones simultáneas calcularían la diferencia
+    # sobre las mismas líneas y descontarían el stock dos veces
+    order = db.query(Order).filter(
+        Order.id == order_id, Order.business_id == current_user.business_id
+    ).with_for_update().first()
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Orden no encontrada"
@@ -376,143 +833,72 @@ def update_order_items(
             detail="No se pueden editar órdenes completadas o canceladas",
         )
 
-    # Restaurar stock de los items actuales
-    for old_item in order.items:
-        if old_item.source_type == "product" and old_item.product_id:
-            # Restaurar stock de producto directo
-            product = (
-                db.query(Product).filter(Product.id == old_item.product_id).first()
-            )
-            if product:
-                product.stock += old_item.quantity
-        elif old_item.source_type == "menu" and old_item.menu_item_id:
-            # Restaurar stock de ingredientes del menu item
-            menu_item = (
-                db.query(MenuItem).filter(MenuItem.id == old_item.menu_item_id).first()
-            )
-            if menu_item:
-                for ingredient in menu_item.ingredients:
-                    from sqlalchemy import select
-                    from ..models.menu import menu_item_ingredients
-
-                    stmt = select(menu_item_ingredients.c.quantity).where(
-                        menu_item_ingredients.c.menu_item_id == menu_item.id,
-                        menu_item_ingredients.c.product_id == ingredient.id,
-                    )
-                    result = db.execute(stmt).first()
-                    ingredient_qty = result[0] if result else 0
-                    ingredient.stock += ingredient_qty * old_item.quantity
-
-    # Eliminar items actuales
+    # Agrupar items actuales y nuevos por (source_type, id, notas)
+    old_groups = {}
     for item in order.items:
-        db.delete(item)
+        old_groups.setdefault(_line_key(item), []).append(item)
 
-    # Crear nuevos items (reutilizar la misma lógica que en create_order)
-    subtotal = 0
+    new_lines = {}
     for item_data in items_data.items:
-        # Determinar si es producto directo o menu item
-        if item_data.source_type == "menu" and item_data.menu_item_id:
-            # Item del menú (copiar lógica de create_order)
-            menu_item = (
-                db.query(MenuItem).filter(MenuItem.id == item_data.menu_item_id).first()
-            )
-            if not menu_item:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Item de menú con ID {item_data.menu_item_id} no encontrado",
-                )
-
-            if not menu_item.is_available:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"El item '{menu_item.name}' no está disponible",
-                )
-
-            # Verificar ingredientes y descontar stock
-            for ingredient in menu_item.ingredients:
-                from sqlalchemy import select
-                from ..models.menu import menu_item_ingredients
-
-                stmt = select(menu_item_ingredients.c.quantity).where(
-                    menu_item_ingredients.c.menu_item_id == menu_item.id,
-                    menu_item_ingredients.c.product_id == ingredient.id,
-                )
-                result = db.execute(stmt).first()
-                ingredient_qty = result[0] if result else 0
-                required_qty = ingredient_qty * item_data.quantity
-
-                if ingredient.stock < required_qty:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Stock insuficiente del ingrediente '{ingredient.name}' para '{menu_item.name}'",
-                    )
-
-            item_subtotal = menu_item.price * item_data.quantity
-            subtotal += item_subtotal
-
-            order_item = OrderItem(
-                menu_item_id=item_data.menu_item_id,
-                source_type="menu",
-                quantity=item_data.quantity,
-                unit_price=menu_item.price,
-                subtotal=item_subtotal,
-                notes=item_data.notes,
+        if line_source(item_data) is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Debe proporcionar product_id o menu_item_id",
             )
-            order.items.append(order_item)
-
-            # Reducir stock de ingredientes
-            for ingredient in menu_item.ingredients:
-                from sqlalchemy import select
-                from ..models.menu import menu_item_ingredients
-
-                stmt = select(menu_item_ingredients.c.quantity).where(
-                    menu_item_ingredients.c.menu_item_id == menu_item.id,
-                    menu_item_ingredients.c.product_id == ingredient.id,
-                )
-                result = db.execute(stmt).first()
-                ingredient_qty = result[0] if result else 0
-                ingredient.stock -= ingredient_qty * item_data.quantity
-
+        key = _line_key(item_data)
+        if key in new_lines:
+            quantity = new_lines[key].quantity + item_data.quantity
+            new_lines[key] = new_lines[key].model_copy(update={"quantity": quantity})
         else:
-            # Producto directo
-            if not item_data.product_id:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Debe proporcionar product_id o menu_item_id",
-                )
-
-            product = (
-                db.query(Product).filter(Product.id == item_data.product_id).first()
-            )
-            if not product:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Producto con ID {item_data.product_id} no encontrado",
-                )
-
-            if product.stock < item_data.quantity:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Stock insuficiente para {product.name}",
-                )
-
-            item_subtotal = product.sale_price * item_data.quantity
-            subtotal += item_subtotal
-
-            order_item = OrderItem(
-                product_id=item_data.product_id,
-                source_type="product",
-                quantity=item_data.quantity,
-                unit_price=product.sale_price,
-                subtotal=item_subtotal,
-                notes=item_data.notes,
-            )
-            order.items.append(order_item)
-            product.stock -= item_data.quantity
+            new_lines[key] = item_data
+
+    # Solo se tocan las líneas agregadas, eliminadas o con cantidad distinta
+    deltas = {}
+    for key in old_groups.keys() | new_lines.keys():
+        old_qty = sum(item.quantity for item in old_groups.get(key, []))
+        new_qty = new_lines[key].quantity if key in new_lines else 0
+        if new_qty != old_qty:
+            deltas[key] = new_qty - old_qty
+
+    if deltas:
+        changed_lines = [new_lines[key] for key in deltas if key in new_lines]
+        catalog = load_order_catalog(
+            db,
+            changed_lines + [old_groups[key][0] for key in deltas if key not in new_lines],
+            current_user.business_id,
+        )
+        priced_items, _ = build_order_items(catalog, changed_lines)
+        priced = dict(zip((_line_key(line) for line in changed_lines), priced_items))
+
+        # Aplicar solo la diferencia neta de ingredientes
+        quantities = {}
+        for key, delta in deltas.items():
+            if key[1] is not None:
+                quantities[key[:2]] = quantities.get(key[:2], 0) + delta
+        demand = source_demand(catalog, quantities)
+        release_stock(db, {pid: -qty for pid, qty in demand.items() if qty < 0})
+        _reserve_or_fail(db, catalog, demand, changed_lines)
+
+        for key in deltas:
+            existing = old_groups.get(key, [])
+            if key not in priced:
+                for item in existing:
+                    order.items.remove(item)
+            elif existing:
+                kept = existing[0]
+                kept.quantity = priced[key].quantity
+                kept.unit_price = priced[key].unit_price
+                kept.subtotal = priced[key].subtotal
+                for item in existing[1:]:
+                    order.items.remove(item)
+            else:
+                order.items.append(priced[key])
+
+    subtotal = sum(item.subtotal for item in order.items)
 
     # Recalcular totales
     order.subtotal = subtotal
-    order.tax = subtotal * 0.16
+    order.tax = subtotal * get_business_settings(db, order.business_id).tax_rate
     order.total = subtotal + order.tax - order.discount
 
     # Recalcular payment_status basado en pagos existentes
@@ -524,20 +910,9 @@ def update_order_items(
     else:
         order.payment_status = "pending"
 
+    _enqueue_order_event(db, current_user, "order_items_changed", order.id)
     db.commit()
-    db.refresh(order)
-
-    # Agregar nombres de métodos de pago
-    for payment in order.payments:
-        payment_method = (
-            db.query(PaymentMethod)
-            .filter(PaymentMethod.id == payment.payment_method_id)
-            .first()
-        )
-        if payment_method:
-            payment.payment_method_name = payment_method.name
-
-    return order
+    return _order_response(db, order.id)
 
 
 @router.delete("/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -546,17 +921,17 @@ def delete_order(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = db.query(Order).filter(
+        Order.id == order_id, Order.business_id == current_user.business_id
+    ).first()
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Orden no encontrada"
         )
 
     # Liberar mesa si está asignada
-    if order.table_id:
-        table = db.query(Table).filter(Table.id == order.table_id).first()
-        if table:
-            table.status = TableStatus.AVAILABLE
+    _enqueue_table(db, current_user, "table_released", order.table_id)
+    _enqueue_order_event(db, current_user, "order_deleted", order_id)
 
     db.delete(order)
     db.commit()
@@ -567,11 +942,21 @@ def delete_order(
 def add_payments_to_order(
     order_id: int,
     payment_data: AddPaymentsToOrder,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Agregar pagos a una orden existente"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    # Un reintento con la misma Idempotency-Key no duplica los pagos
+    idempotency, replay = claim_idempotency_key(
+        db, idempotency_key, current_user.business_id, f"orders.{order_id}.payments", request_hash(payment_data)
+    )
+    if replay:
+        return replay
+
+    order = db.query(Order).filter(
+        Order.id == order_id, Order.business_id == current_user.business_id
+    ).first()
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Orden no encontrada"
@@ -589,24 +974,9 @@ def add_payments_to_order(
             detail=f"Los pagos exceden el total de la orden. Ya pagado: ${existing_payments:.2f}, Nuevo: ${new_payments_total:.2f}, Total orden: ${order.total:.2f}",
         )
 
-    # Crear los nuevos pagos
+    # Crear los nuevos pagos (métodos de pago verificados en una sola consulta)
+    _check_payment_methods(payment_data.payments, _active_payment_method_ids(db, payment_data.payments))
     for payment in payment_data.payments:
-        # Verificar que el método existe y está activo
-        payment_method = (
-            db.query(PaymentMethod)
-            .filter(
-                PaymentMethod.id == payment.payment_method_id,
-                PaymentMethod.is_active == True,
-            )
-            .first()
-        )
-
-        if not payment_method:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Método de pago con ID {payment.payment_method_id} no encontrado o inactivo",
-            )
-
         order_payment = OrderPayment(
             payment_method_id=payment.payment_method_id,
             amount=payment.amount,
@@ -622,17 +992,9 @@ def add_payments_to_order(
     elif total_after_payments > 0:
         order.payment_status = "partial"
 
+    db.flush()
+    response = _order_response(db, order.id)
+    complete_idempotency_key(idempotency, response)
+    _enqueue_order_event(db, current_user, "order_status_changed", order.id)
     db.commit()
-    db.refresh(order)
-
-    # Agregar nombres de métodos de pago
-    for payment in order.payments:
-        payment_method = (
-            db.query(PaymentMethod)
-            .filter(PaymentMethod.id == payment.payment_method_id)
-            .first()
-        )
-        if payment_method:
-            payment.payment_method_name = payment_method.name
-
-    return order
+    return response
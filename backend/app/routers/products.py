@@ -3,9 +3,15 @@ from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
 from ..models.product import Product, Category
+from ..models.menu import MenuItem, menu_item_ingredients
 from ..models.user import User
-from ..schemas.product import ProductCreate, ProductUpdate, ProductResponse, CategoryCreate, CategoryResponse
+from ..schemas.product import (
+    ProductCreate, ProductUpdate, ProductResponse, ProductUsageResponse, CategoryCreate, CategoryResponse
+)
 from ..utils.dependencies import get_current_user, get_current_active_manager
+from ..utils.menu_availability import refresh_portions
+from ..utils.menu_costs import refresh_costs
+from ..utils.catalog_snapshot import invalidate_catalog
 
 router = APIRouter(prefix="/products", tags=["products"])
 
@@ -18,6 +24,7 @@ def create_category(
     current_user: User = Depends(get_current_active_manager)
 ):
     db_category = db.query(Category).filter(
+        Category.business_id == current_user.business_id,
         Category.name == category.name,
         Category.deleted_at.is_(None)  # Solo categorías no eliminadas
     ).first()
@@ -27,7 +34,7 @@ def create_category(
             detail="La categoría ya existe"
         )
     
-    new_category = Category(**category.model_dump())
+    new_category = Category(**category.model_dump(), business_id=current_user.business_id)
     db.add(new_category)
     db.commit()
     db.refresh(new_category)
@@ -42,6 +49,7 @@ def read_categories(
     current_user: User = Depends(get_current_user)
 ):
     categories = db.query(Category).filter(
+        Category.business_id == current_user.business_id,
         Category.deleted_at.is_(None)  # Solo categorías no eliminadas
     ).offset(skip).limit(limit).all()
     return categories
@@ -56,6 +64,7 @@ def create_product(
 ):
     # Verificar que la categoría existe y no está eliminada
     category = db.query(Category).filter(
+        Category.business_id == current_user.business_id,
         Category.id == product.category_id,
         Category.deleted_at.is_(None)  # Solo categorías no eliminadas
     ).first()
@@ -65,9 +74,10 @@ def create_product(
             detail="Categoría no encontrada"
         )
     
-    new_product = Product(**product.model_dump())
+    new_product = Product(**product.model_dump(), business_id=current_user.business_id)
     db.add(new_product)
     db.commit()
+    invalidate_catalog(current_user.business_id)
     db.refresh(new_product)
     return new_product
 
@@ -80,6 +90,7 @@ def read_products(
     current_user: User = Depends(get_current_user)
 ):
     products = db.query(Product).filter(
+        Product.business_id == current_user.business_id,
         Product.deleted_at.is_(None)  # Solo productos no eliminados
     ).offset(skip).limit(limit).all()
     return products
@@ -92,6 +103,7 @@ def read_product(
     current_user: User = Depends(get_current_user)
 ):
     product = db.query(Product).filter(
+        Product.business_id == current_user.business_id,
         Product.id == product_id,
         Product.deleted_at.is_(None)  # Solo productos no eliminados
     ).first()
@@ -103,6 +115,39 @@ def read_product(
     return product
 
 
+@router.get("/{product_id}/used-in", response_model=List[ProductUsageResponse])
+def read_product_usage(
+    product_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Platillos que usan el producto (índice ix_menu_item_ingredients_product_id)"""
+    exists = db.query(Product.id).filter(
+        Product.business_id == current_user.business_id,
+        Product.id == product_id,
+        Product.deleted_at.is_(None)
+    ).first()
+    if not exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Producto no encontrado"
+        )
+    
+    rows = db.query(
+        MenuItem.id.label("menu_item_id"),
+        MenuItem.name,
+        menu_item_ingredients.c.quantity,
+        MenuItem.is_available,
+        MenuItem.portions_available,
+    ).join(
+        menu_item_ingredients, menu_item_ingredients.c.menu_item_id == MenuItem.id
+    ).filter(
+        menu_item_ingredients.c.product_id == product_id,
+        MenuItem.deleted_at.is_(None)
+    ).order_by(MenuItem.name).all()
+    return [ProductUsageResponse.model_validate(row, from_attributes=True) for row in rows]
+
+
 @router.put("/{product_id}", response_model=ProductResponse)
 def update_product(
     product_id: int,
@@ -111,6 +156,7 @@ def update_product(
     current_user: User = Depends(get_current_active_manager)
 ):
     product = db.query(Product).filter(
+        Product.business_id == current_user.business_id,
         Product.id == product_id,
         Product.deleted_at.is_(None)  # Solo productos no eliminados
     ).first()
@@ -125,7 +171,16 @@ def update_product(
     for field, value in update_data.items():
         setattr(product, field, value)
     
+    # Recalcular porciones y costo de los platillos que usan este producto
+    if "stock" in update_data or "purchase_price" in update_data:
+        db.flush()
+    if "stock" in update_data:
+        refresh_portions(db, product_ids=[product.id])
+    if "purchase_price" in update_data:
+        refresh_costs(db, product_ids=[product.id])
+    
     db.commit()
+    invalidate_catalog(current_user.business_id)
     db.refresh(product)
     return product
 
@@ -139,6 +194,7 @@ def delete_product(
     from datetime import datetime
     
     product = db.query(Product).filter(
+        Product.business_id == current_user.business_id,
         Product.id == product_id,
         Product.deleted_at.is_(None)  # Solo productos no eliminados
     ).first()
@@ -151,5 +207,6 @@ def delete_product(
     # Soft delete: marcar como eliminado con timestamp
     product.deleted_at = datetime.now()
     db.commit()
+    invalidate_catalog(current_user.business_id)
     return None
 
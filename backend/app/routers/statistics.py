@@ -1,12 +1,10 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 from typing import List, Optional
 from datetime import datetime, timedelta
 from ..database import get_db
 from ..models.user import User
-from ..models.order import Order, OrderItem
-from ..models.order_payment import OrderPayment
 from ..models.payment_method import PaymentMethod
 from ..models.customer import Customer
 from ..models.account_receivable import AccountReceivable
@@ -14,6 +12,7 @@ from ..models.account_payable import AccountPayable
 from ..models.product import Product
 from ..models.menu import MenuItem
 from ..utils.dependencies import get_current_user
+from ..utils.order_archive import orders_source, items_source, payments_source
 
 router = APIRouter(prefix="/statistics", tags=["statistics"])
 
@@ -28,12 +27,13 @@ def get_general_statistics(
     
     start_date = datetime.now() - timedelta(days=days)
     
-    # Órdenes del período
-    orders = db.query(Order).filter(
-        Order.user_id.in_(
-            db.query(User.id).filter(User.business_id == current_user.business_id)
-        ),
-        Order.created_at >= start_date
+    # Órdenes del período (incluye el archivo si tiene órdenes del período)
+    source = orders_source(db, current_user.business_id, start_date)
+    orders = db.query(
+        source.c.status, source.c.payment_status, source.c.total, source.c.created_at
+    ).filter(
+        source.c.business_id == current_user.business_id,
+        source.c.created_at >= start_date
     ).all()
     
     # Calcular métricas
@@ -94,27 +94,27 @@ def get_best_sellers(
     
     start_date = datetime.now() - timedelta(days=days)
     
-    # Obtener órdenes del período
-    orders = db.query(Order).filter(
-        Order.user_id.in_(
-            db.query(User.id).filter(User.business_id == current_user.business_id)
-        ),
-        Order.created_at >= start_date
-    ).all()
-    
-    order_ids = [o.id for o in orders]
+    # Items de las órdenes del período (join con orders por negocio y fecha)
+    orders = orders_source(db, current_user.business_id, start_date)
+    items = items_source(db, current_user.business_id, start_date)
+    period_orders = (
+        orders.c.business_id == current_user.business_id,
+        orders.c.created_at >= start_date,
+    )
     
     # Productos más vendidos
     product_sales = db.query(
         Product.id,
         Product.name,
-        func.sum(OrderItem.quantity).label('total_quantity'),
-        func.sum(OrderItem.subtotal).label('total_sales')
+        func.sum(items.c.quantity).label('total_quantity'),
+        func.sum(items.c.subtotal).label('total_sales')
+    ).join(
+        items, items.c.product_id == Product.id
     ).join(
-        OrderItem, OrderItem.product_id == Product.id
+        orders, orders.c.id == items.c.order_id
     ).filter(
-        OrderItem.order_id.in_(order_ids),
-        OrderItem.product_id.isnot(None)
+        *period_orders,
+        items.c.product_id.isnot(None)
     ).group_by(
         Product.id, Product.name
     ).order_by(
@@ -125,13 +125,15 @@ def get_best_sellers(
     menu_sales = db.query(
         MenuItem.id,
         MenuItem.name,
-        func.sum(OrderItem.quantity).label('total_quantity'),
-        func.sum(OrderItem.subtotal).label('total_sales')
+        func.sum(items.c.quantity).label('total_quantity'),
+        func.sum(items.c.subtotal).label('total_sales')
     ).join(
-        OrderItem, OrderItem.menu_item_id == MenuItem.id
+        items, items.c.menu_item_id == MenuItem.id
+    ).join(
+        orders, orders.c.id == items.c.order_id
     ).filter(
-        OrderItem.order_id.in_(order_ids),
-        OrderItem.menu_item_id.isnot(None)
+        *period_orders,
+        items.c.menu_item_id.isnot(None)
     ).group_by(
         MenuItem.id, MenuItem.name
     ).order_by(
@@ -142,13 +144,15 @@ def get_best_sellers(
     worst_products = db.query(
         Product.id,
         Product.name,
-        func.sum(OrderItem.quantity).label('total_quantity'),
-        func.sum(OrderItem.subtotal).label('total_sales')
+        func.sum(items.c.quantity).label('total_quantity'),
+        func.sum(items.c.subtotal).label('total_sales')
+    ).join(
+        items, items.c.product_id == Product.id
     ).join(
-        OrderItem, OrderItem.product_id == Product.id
+        orders, orders.c.id == items.c.order_id
     ).filter(
-        OrderItem.order_id.in_(order_ids),
-        OrderItem.product_id.isnot(None)
+        *period_orders,
+        items.c.product_id.isnot(None)
     ).group_by(
         Product.id, Product.name
     ).order_by(
@@ -256,27 +260,35 @@ def get_financial_statistics(
     
     start_date = datetime.now() - timedelta(days=days)
     
-    # Ingresos (órdenes pagadas) - cargar pagos y métodos de pago
-    orders = db.query(Order).options(
-        joinedload(Order.payments).joinedload(OrderPayment.payment_method)
+    # Ingresos (órdenes pagadas del período, incluye el archivo si corresponde)
+    orders = orders_source(db, current_user.business_id, start_date)
+    payments = payments_source(db, current_user.business_id, start_date)
+    paid_orders = (
+        orders.c.business_id == current_user.business_id,
+        orders.c.payment_status == 'paid',
+        orders.c.created_at >= start_date,
+    )
+    
+    total_income = db.query(func.coalesce(func.sum(orders.c.total), 0)).filter(*paid_orders).scalar()
+    
+    # Ingresos por método de pago (sumados en la base de datos)
+    method_totals = db.query(
+        PaymentMethod.name,
+        func.sum(payments.c.amount)
+    ).select_from(payments).join(
+        orders, orders.c.id == payments.c.order_id
+    ).outerjoin(
+        PaymentMethod, PaymentMethod.id == payments.c.payment_method_id
     ).filter(
-        Order.user_id.in_(
-            db.query(User.id).filter(User.business_id == current_user.business_id)
-        ),
-        Order.payment_status == 'paid',
-        Order.created_at >= start_date
+        *paid_orders
+    ).group_by(
+        PaymentMethod.name
     ).all()
     
-    total_income = sum(o.total for o in orders)
-    
-    # Ingresos por método de pago (aproximado usando order.payments)
     income_by_method = {}
-    for order in orders:
-        if order.payments:
-            for payment in order.payments:
-                # Acceder al nombre del método de pago a través de la relación
-                method_name = payment.payment_method.name if payment.payment_method else 'Otro'
-                income_by_method[method_name] = income_by_method.get(method_name, 0) + payment.amount
+    for name, amount in method_totals:
+        method_name = name or 'Otro'
+        income_by_method[method_name] = income_by_method.get(method_name, 0) + amount
     
     # Egresos (cuentas por pagar pagadas en el período)
     payables = db.query(AccountPayable).filter(
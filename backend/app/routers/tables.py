@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
 from ..models.table import Table
+from ..models.order import ACTIVE_ORDER_STATUSES, Order
 from ..models.user import User
-from ..schemas.table import TableCreate, TableUpdate, TableResponse
+from ..schemas.order import OrderSummaryResponse
+from ..schemas.table import TableCreate, TableUpdate, TableResponse, TableFloorResponse
 from ..utils.dependencies import get_current_user, get_current_active_manager
 
 router = APIRouter(prefix="/tables", tags=["tables"])
@@ -46,6 +49,53 @@ def read_tables(
     return tables
 
 
+@router.get("/floor", response_model=List[TableFloorResponse])
+def read_tables_floor(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Plano del salón: todas las mesas con el resumen de su orden activa, en una sola consulta.
+    Si una mesa tiene varias órdenes activas se muestra la más reciente.
+    """
+    rows = db.query(
+        Table,
+        Order.id.label("order_id"),
+        Order.status.label("order_status"),
+        Order.payment_status,
+        Order.total,
+        Order.created_at.label("order_created_at"),
+    ).outerjoin(
+        Order,
+        and_(
+            Order.table_id == Table.id,
+            Order.status.in_(ACTIVE_ORDER_STATUSES),
+            Order.business_id == current_user.business_id,
+        ),
+    ).filter(
+        Table.deleted_at.is_(None)  # Solo mesas no eliminadas
+    ).order_by(
+        Table.number, Order.created_at.desc()
+    ).all()
+
+    floor = {}
+    for row in rows:
+        if row.Table.id in floor:
+            continue  # Ya se tomó la orden más reciente de la mesa
+        table = TableFloorResponse.model_validate(row.Table)
+        if row.order_id is not None:
+            table.active_order = OrderSummaryResponse(
+                id=row.order_id,
+                table_id=row.Table.id,
+                status=row.order_status,
+                payment_status=row.payment_status,
+                total=row.total,
+                created_at=row.order_created_at,
+            )
+        floor[row.Table.id] = table
+    return list(floor.values())
+
+
 @router.get("/{table_id}", response_model=TableResponse)
 def read_table(
     table_id: int,
@@ -3,10 +3,11 @@ from .product import (
     ProductCreate,
     ProductUpdate,
     ProductResponse,
+    ProductUsageResponse,
     CategoryCreate,
     CategoryResponse,
 )
-from .table import TableCreate, TableUpdate, TableResponse
+from .table import TableCreate, TableUpdate, TableResponse, TableFloorResponse
 from .order import (
     OrderCreate,
     OrderUpdate,
@@ -14,11 +15,17 @@ from .order import (
     OrderItemCreate,
     AddPaymentsToOrder,
     UpdateOrderItems,
+    OrderSummaryResponse,
+    OrderBulkStatusUpdate,
+    OrderBulkStatusResponse,
+    OrderSyncBatch,
+    OrderSyncResponse,
 )
 from .menu import (
     MenuItemCreate,
     MenuItemUpdate,
     MenuItemResponse,
+    MenuItemMarginResponse,
     MenuCategoryCreate,
     MenuCategoryUpdate,
     MenuCategoryResponse,
@@ -27,6 +34,7 @@ from .configuration import (
     BusinessConfigurationCreate,
     BusinessConfigurationUpdate,
     BusinessConfigurationResponse,
+    BusinessPricingResponse,
     PartnerCreate,
     PartnerUpdate,
     PartnerResponse,
@@ -47,11 +55,13 @@ __all__ = [
     "ProductCreate",
     "ProductUpdate",
     "ProductResponse",
+    "ProductUsageResponse",
     "CategoryCreate",
     "CategoryResponse",
     "TableCreate",
     "TableUpdate",
     "TableResponse",
+    "TableFloorResponse",
     "OrderCreate",
     "OrderUpdate",
     "OrderResponse",
@@ -59,12 +69,14 @@ __all__ = [
     "MenuItemCreate",
     "MenuItemUpdate",
     "MenuItemResponse",
+    "MenuItemMarginResponse",
     "MenuCategoryCreate",
     "MenuCategoryUpdate",
     "MenuCategoryResponse",
     "BusinessConfigurationCreate",
     "BusinessConfigurationUpdate",
     "BusinessConfigurationResponse",
+    "BusinessPricingResponse",
     "PartnerCreate",
     "PartnerUpdate",
     "PartnerResponse",
@@ -74,4 +86,9 @@ __all__ = [
     "PaymentMethodType",
     "AddPaymentsToOrder",
     "UpdateOrderItems",
+    "OrderSummaryResponse",
+    "OrderBulkStatusUpdate",
+    "OrderBulkStatusResponse",
+    "OrderSyncBatch",
+    "OrderSyncResponse",
 ]
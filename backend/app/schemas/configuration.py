@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -45,7 +45,7 @@ class BusinessConfigurationBase(BaseModel):
     phone: Optional[str] = None
     email: Optional[EmailStr] = None
     address: Optional[str] = None
-    tax_rate: float = 0.16
+    tax_rate: float = Field(16, ge=0, le=100)  # Porcentaje (16 = 16%)
     currency: str = "USD"
     logo_url: Optional[str] = None
 
@@ -62,11 +62,17 @@ class BusinessConfigurationUpdate(BaseModel):
     phone: Optional[str] = None
     email: Optional[EmailStr] = None
     address: Optional[str] = None
-    tax_rate: Optional[float] = None
+    tax_rate: Optional[float] = Field(None, ge=0, le=100)  # Porcentaje
     currency: Optional[str] = None
     logo_url: Optional[str] = None
 
 
+class BusinessPricingResponse(BaseModel):
+    """Datos para calcular totales en el punto de venta igual que el servidor"""
+    tax_rate: float  # Porcentaje (16 = 16%)
+    currency: str
+
+
 class BusinessConfigurationResponse(BusinessConfigurationBase):
     id: int
     created_at: datetime
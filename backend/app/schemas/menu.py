@@ -64,6 +64,10 @@ class MenuItemUpdate(BaseModel):
 
 class MenuItemResponse(MenuItemBase):
     id: int
+    portions_available: Optional[int] = None  # Calculado según el stock de los ingredientes
+    recipe_cost: Optional[float] = None  # Costo de los ingredientes por porción
+    margin: Optional[float] = None  # price - recipe_cost
+    margin_percent: Optional[float] = None  # Margen sobre el precio de venta
     created_at: datetime
     updated_at: Optional[datetime] = None
     ingredients: List[IngredientItem] = []
@@ -72,9 +76,21 @@ class MenuItemResponse(MenuItemBase):
         from_attributes = True
 
 
+class MenuItemMarginResponse(BaseModel):
+    """Fila del reporte de márgenes por platillo"""
+    id: int
+    name: str
+    category_id: int
+    price: float
+    recipe_cost: float
+    margin: float
+    margin_percent: Optional[float] = None
+
+
 class MenuItemPublicResponse(MenuItemBase):
     """Schema simplificado para catálogo público (sin ingredientes)"""
     id: int
+    portions_available: Optional[int] = None
     
     class Config:
         from_attributes = True
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, field_validator, model_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import Optional, List
 from datetime import datetime
 from ..models.order import OrderStatus, PaymentMethod
@@ -86,3 +86,49 @@ class AddPaymentsToOrder(BaseModel):
 
 class UpdateOrderItems(BaseModel):
     items: List[OrderItemCreate]
+
+
+class OrderSummaryResponse(BaseModel):
+    """Vista liviana de la orden para listados (sin items ni pagos)"""
+    id: int
+    table_id: Optional[int] = None
+    status: OrderStatus
+    payment_status: str = "pending"
+    total: float
+    created_at: datetime
+
+
+class OrderBulkStatusUpdate(BaseModel):
+    order_ids: List[int] = Field(..., min_length=1, max_length=500)
+    status: OrderStatus
+
+
+class OrderBulkStatusSkipped(BaseModel):
+    id: int
+    detail: str
+
+
+class OrderBulkStatusResponse(BaseModel):
+    updated: List[int]  # Órdenes que cambiaron de estado
+    skipped: List[OrderBulkStatusSkipped] = []  # Órdenes no encontradas, canceladas o ya en ese estado
+
+
+class OrderSyncItem(OrderCreate):
+    """Orden creada sin conexión en un kiosco"""
+    client_id: str  # Identificador generado por el cliente (evita duplicados al reintentar)
+    created_at: Optional[datetime] = None  # Momento real en que se tomó la orden
+
+
+class OrderSyncBatch(BaseModel):
+    orders: List[OrderSyncItem] = Field(..., max_length=1000)
+
+
+class OrderSyncResult(BaseModel):
+    client_id: str
+    status: str  # created, duplicate, error
+    order_id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class OrderSyncResponse(BaseModel):
+    results: List[OrderSyncResult]
@@ -59,3 +59,12 @@ class ProductResponse(ProductBase):
     class Config:
         from_attributes = True
 
+
+class ProductUsageResponse(BaseModel):
+    """Platillo del menú que usa el producto como ingrediente"""
+    menu_item_id: int
+    name: str
+    quantity: float  # Cantidad del producto por porción
+    is_available: bool
+    portions_available: Optional[int] = None
+
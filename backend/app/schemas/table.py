@@ -2,6 +2,7 @@ from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 from ..models.table import TableStatus
+from .order import OrderSummaryResponse
 
 
 class TableBase(BaseModel):
@@ -29,3 +30,8 @@ class TableResponse(TableBase):
     class Config:
         from_attributes = True
 
+
+
+class TableFloorResponse(TableResponse):
+    """Mesa con el resumen de su orden activa (plano del salón)"""
+    active_order: Optional[OrderSummaryResponse] = None
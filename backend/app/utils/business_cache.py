@@ -0,0 +1,53 @@
+"""
+Caché en memoria de la configuración fiscal de cada negocio
+business_id -> (tax_percent, currency), usada al valorizar órdenes sin consultar
+business_configuration en cada solicitud.
+business_configuration.tax_rate se guarda como porcentaje (16 = 16%), igual que
+en la pantalla de configuración; tax_rate es la fracción para multiplicar.
+Las entradas vencen después de BUSINESS_CACHE_TTL segundos (utils.ttl_cache).
+"""
+from sqlalchemy.orm import Session
+from typing import NamedTuple, Optional
+from ..models.configuration import BusinessConfiguration
+from .ttl_cache import TTLCache
+
+DEFAULT_TAX_PERCENT = 16.0  # IVA usado cuando el negocio no tiene configuración
+DEFAULT_CURRENCY = "USD"
+BUSINESS_CACHE_TTL = 300  # Segundos
+
+
+class BusinessSettings(NamedTuple):
+    tax_percent: float
+    currency: str
+
+    @property
+    def tax_rate(self) -> float:
+        """Fracción del subtotal (16% -> 0.16)"""
+        return self.tax_percent / 100
+
+
+_cache = TTLCache(ttl=BUSINESS_CACHE_TTL)  # business_id -> BusinessSettings
+
+
+def get_business_settings(db: Session, business_id: Optional[int]) -> BusinessSettings:
+    """Configuración fiscal del negocio (desde la caché o con una consulta)"""
+    return _cache.get_or_load(business_id, lambda: _load_settings(db, business_id))
+
+
+def _load_settings(db: Session, business_id: Optional[int]) -> BusinessSettings:
+    loaded = BusinessSettings(DEFAULT_TAX_PERCENT, DEFAULT_CURRENCY)
+    if business_id is not None:
+        row = (
+            db.query(BusinessConfiguration.tax_rate, BusinessConfiguration.currency)
+            .filter(BusinessConfiguration.id == business_id)
+            .first()
+        )
+        if row:
+            tax_percent = row.tax_rate if row.tax_rate is not None else DEFAULT_TAX_PERCENT
+            loaded = BusinessSettings(tax_percent, row.currency or DEFAULT_CURRENCY)
+    return loaded
+
+
+def invalidate_business_settings(business_id: Optional[int]) -> None:
+    """Descarta la configuración del negocio (llamar después de confirmar cambios)"""
+    _cache.invalidate(business_id)
@@ -0,0 +1,245 @@
+"""
+Instantáneas pre-renderizadas del catálogo público
+Por cada negocio se renderiza una vez el JSON de cada sección (productos,
+menú, categorías del menú) junto con sus variantes gzip y brotli (si está
+instalado el paquete brotli). Las rutas públicas sirven esos bytes desde
+memoria con un ETag fuerte y responden 304 si el cliente ya los tiene.
+Las escrituras de productos y menú invalidan después del commit; los cambios
+de stock de las órdenes marcan la sesión con mark_catalog_stale() y se
+invalidan al confirmar, solo para los negocios afectados. La instantánea se
+reconstruye en la siguiente lectura. Con varios procesos la invalidación es
+local: las entradas vencen después de CATALOG_CACHE_TTL segundos.
+El paquete de GET /public/{slug}/catalog se arma concatenando los bytes de
+las secciones pedidas, sin volver a serializar, y se guarda por combinación.
+El detalle de cada platillo con su receta se guarda por (negocio, platillo).
+"""
+import gzip
+import hashlib
+import json
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from fastapi import Request, Response
+from ..models.product import Product
+from ..models.menu import MenuItem, MenuCategory, menu_item_ingredients
+from ..schemas.product import ProductResponse
+from ..schemas.menu import MenuItemPublicResponse, MenuCategoryResponse
+from .ttl_cache import MISSING, TTLCache
+
+try:
+    import brotli
+except ImportError:  # Opcional: sin brotli se sirve gzip
+    brotli = None
+
+CATALOG_CACHE_TTL = 60  # Segundos
+
+SECTIONS = ("products", "menu", "menu_categories")
+# Secciones del paquete (parámetro include) -> sección de la instantánea
+BUNDLE_SECTIONS = {"categories": "menu_categories", "menu": "menu", "products": "products"}
+
+_products_adapter = TypeAdapter(List[ProductResponse])
+_menu_adapter = TypeAdapter(List[MenuItemPublicResponse])
+_categories_adapter = TypeAdapter(List[MenuCategoryResponse])
+
+
+class RenderedSection(NamedTuple):
+    body: bytes
+    gzip: bytes
+    br: Optional[bytes]
+    etag: str  # Del JSON sin comprimir; las variantes comprimidas agregan un sufijo
+
+
+# Claves: ("snapshot", business_id) -> sección -> bytes,
+# ("bundle", business_id, include) -> paquete, ("detail", business_id, menu_item_id) -> detalle
+_cache = TTLCache(ttl=CATALOG_CACHE_TTL)
+
+
+def _render(body: bytes) -> RenderedSection:
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    compressed_br = brotli.compress(body) if brotli else None
+    return RenderedSection(body, gzip.compress(body, mtime=0), compressed_br, etag)
+
+
+def _build(db: Session, business_id: int) -> Dict[str, RenderedSection]:
+    """Consulta y serializa todas las secciones del catálogo del negocio (índices parciales por negocio)"""
+    products = db.query(Product).filter(
+        Product.business_id == business_id,
+        Product.show_in_catalog == True,
+        Product.deleted_at.is_(None),
+        Product.stock > 0
+    ).order_by(Product.id).all()
+    menu_items = db.query(MenuItem).filter(
+        MenuItem.business_id == business_id,
+        MenuItem.is_available == True,
+        MenuItem.deleted_at.is_(None)
+    ).order_by(MenuItem.id).all()
+    categories = db.query(MenuCategory).filter(
+        MenuCategory.business_id == business_id,
+        MenuCategory.is_active == True,
+        MenuCategory.deleted_at.is_(None)
+    ).order_by(MenuCategory.display_order).all()
+
+    return {
+        "products": _render(_products_adapter.dump_json(
+            _products_adapter.validate_python(products, from_attributes=True))),
+        "menu": _render(_menu_adapter.dump_json(
+            _menu_adapter.validate_python(menu_items, from_attributes=True))),
+        "menu_categories": _render(_categories_adapter.dump_json(
+            _categories_adapter.validate_python(categories, from_attributes=True))),
+    }
+
+
+def get_catalog_snapshot(db: Session, business_id: int) -> Dict[str, RenderedSection]:
+    """Secciones renderizadas del catálogo del negocio (se construyen si no existen)"""
+    return _cache.get_or_load(("snapshot", business_id), lambda: _build(db, business_id))
+
+
+def get_catalog_bundle(
+    db: Session, business_id: int, info: Dict[str, Any], include: Tuple[str, ...]
+) -> RenderedSection:
+    """Paquete {info, categories, menu, products} con solo las secciones de `include`"""
+    return _cache.get_or_load(
+        ("bundle", business_id, include), lambda: _build_bundle(db, business_id, info, include)
+    )
+
+
+def _build_bundle(db: Session, business_id: int, info: Dict[str, Any], include: Tuple[str, ...]) -> RenderedSection:
+    snapshot = get_catalog_snapshot(db, business_id)
+    parts = []
+    for name in include:
+        if name == "info":
+            body = json.dumps(info, separators=(",", ":"), ensure_ascii=False).encode()
+        else:
+            body = snapshot[BUNDLE_SECTIONS[name]].body
+        parts.append(b'"' + name.encode() + b'":' + body)
+    return _render(b"{" + b",".join(parts) + b"}")
+
+
+def load_menu_item_detail(db: Session, business_id: int, menu_item_id: int) -> Optional[Dict[str, Any]]:
+    """Platillo disponible con sus ingredientes (nombre, unidad y cantidad) en una sola consulta"""
+    rows = db.execute(
+        select(
+            MenuItem.id,
+            MenuItem.name,
+            MenuItem.description,
+            MenuItem.category_id,
+            MenuItem.price,
+            MenuItem.preparation_time,
+            MenuItem.is_available,
+            MenuItem.is_featured,
+            MenuItem.portions_available,
+            MenuItem.image_url,
+            menu_item_ingredients.c.product_id,
+            menu_item_ingredients.c.quantity,
+            Product.name.label("product_name"),
+            Product.unit_type,
+        )
+        .outerjoin(menu_item_ingredients, menu_item_ingredients.c.menu_item_id == MenuItem.id)
+        .outerjoin(Product, Product.id == menu_item_ingredients.c.product_id)
+        .where(
+            MenuItem.id == menu_item_id,
+            MenuItem.business_id == business_id,
+            MenuItem.is_available == True,
+            MenuItem.deleted_at.is_(None),
+        )
+        .order_by(menu_item_ingredients.c.product_id)
+    ).all()
+    if not rows:
+        return None
+
+    item = rows[0]
+    return {
+        "id": item.id,
+        "name": item.name,
+        "description": item.description,
+        "category_id": item.category_id,
+        "price": item.price,
+        "preparation_time": item.preparation_time,
+        "is_available": item.is_available,
+        "is_featured": item.is_featured,
+        "portions_available": item.portions_available,
+        "image_url": item.image_url,
+        "ingredients": [
+            {
+                "product_id": row.product_id,
+                "product_name": row.product_name,
+                "quantity": row.quantity,
+                "unit_type": row.unit_type.value if row.unit_type else None,
+            }
+            for row in rows if row.product_id is not None
+        ],
+    }
+
+
+def get_menu_item_detail(db: Session, business_id: int, menu_item_id: int) -> Optional[RenderedSection]:
+    """Detalle renderizado del platillo; None si no existe o no está disponible (no se guarda)"""
+    key = ("detail", business_id, menu_item_id)
+    detail, generation = _cache.lookup(key)
+    if detail is not MISSING:
+        return detail
+
+    data = load_menu_item_detail(db, business_id, menu_item_id)
+    if data is None:
+        return None
+    detail = _render(json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode())
+    _cache.store(key, detail, generation)
+    return detail
+
+
+def invalidate_catalog(business_id: Optional[int] = None) -> None:
+    """Descarta la instantánea del negocio (o todas); llamar después de confirmar cambios"""
+    if business_id is None:
+        _cache.invalidate()
+    else:
+        _cache.invalidate_where(lambda key: key[1] == business_id)
+
+
+def mark_catalog_stale(db: Session, business_ids: Iterable[Optional[int]]) -> None:
+    """Invalida el catálogo de los negocios indicados cuando se confirme la transacción actual"""
+    db.info.setdefault("catalog_stale", set()).update(business_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    for business_id in session.info.pop("catalog_stale", ()):
+        if business_id is not None:
+            invalidate_catalog(business_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop("catalog_stale", None)
+
+
+def _accepts(request: Request, encoding: str) -> bool:
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == encoding and params.replace(" ", "") != "q=0":
+            return True
+    return False
+
+
+def snapshot_response(request: Request, section: RenderedSection) -> Response:
+    """Respuesta con la mejor codificación aceptada por el cliente, o 304 si el ETag coincide"""
+    if section.br is not None and _accepts(request, "br"):
+        body, encoding, etag = section.br, "br", section.etag[:-1] + '-br"'
+    elif _accepts(request, "gzip"):
+        body, encoding, etag = section.gzip, "gzip", section.etag[:-1] + '-gz"'
+    else:
+        body, encoding, etag = section.body, None, section.etag
+
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "no-cache",  # Guardar, pero revalidar con If-None-Match
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip() for tag in if_none_match.split(",")}
+        if etag in candidates or "*" in candidates:
+            return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
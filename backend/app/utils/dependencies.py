@@ -1,13 +1,14 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session, joinedload
 from ..database import get_db
 from ..models.user import User, UserRole
 from ..models.role_permission import Role, Permission
 from ..utils.security import decode_access_token
-from typing import List, Set
+from typing import List, Optional, Set
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="api/auth/login", auto_error=False)
 
 
 async def get_current_user(
@@ -44,6 +45,15 @@ async def get_current_user(
     return user
 
 
+async def get_current_stream_user(
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    access_token: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+) -> User:
+    """Como get_current_user, pero acepta ?access_token= (EventSource no puede enviar encabezados)"""
+    return await get_current_user(token or access_token or "", db)
+
+
 def get_user_permissions(user: User) -> Set[str]:
     """Obtiene todos los permisos de un usuario desde sus roles personalizados"""
     permissions = set()
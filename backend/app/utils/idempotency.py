@@ -0,0 +1,154 @@
+"""
+Soporte para el encabezado Idempotency-Key
+La clave se reclama insertando su fila en la misma transacción que la
+operación: un reintento concurrente espera en el índice único y luego recibe
+la respuesta guardada; si la operación falla, el rollback libera la clave.
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, Optional, Tuple
+from ..models.idempotency_key import IdempotencyKey
+
+IDEMPOTENCY_TTL = timedelta(hours=24)
+
+
+def request_hash(payload: BaseModel) -> str:
+    """Huella del cuerpo de la solicitud para detectar claves reutilizadas"""
+    return hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+
+def claim_idempotency_key(
+    db: Session,
+    key: Optional[str],
+    business_id: Optional[int],
+    scope: str,
+    fingerprint: str,
+) -> Tuple[Optional[IdempotencyKey], Optional[Response]]:
+    """
+    Reclama la clave para esta solicitud.
+    Retorna (registro a completar, None) o (None, respuesta guardada) si es un reintento.
+    Sin clave retorna (None, None) y la solicitud se procesa normalmente.
+    """
+    if not key:
+        return None, None
+
+    record = _find(db, key, business_id, scope)
+    if record and record.expires_at <= datetime.now(timezone.utc):
+        db.delete(record)
+        db.flush()
+        record = None
+
+    if record is None:
+        record = IdempotencyKey(
+            business_id=business_id,
+            scope=scope,
+            key=key,
+            request_hash=fingerprint,
+            expires_at=datetime.now(timezone.utc) + IDEMPOTENCY_TTL,
+        )
+        db.add(record)
+        try:
+            db.flush()
+            return record, None
+        except IntegrityError:
+            # Otra solicitud con la misma clave se confirmó mientras esperábamos
+            db.rollback()
+            record = _find(db, key, business_id, scope)
+
+    return None, _replay(record, fingerprint)
+
+
+def complete_idempotency_key(
+    record: Optional[IdempotencyKey], response: BaseModel, status_code: int = status.HTTP_200_OK
+) -> None:
+    """Guarda la respuesta en el registro reclamado (se confirma junto con la operación)"""
+    if record is None:
+        return
+
+    body = response.model_dump_json()
+    record.response_body = body
+    record.response_hash = hashlib.sha256(body.encode()).hexdigest()
+    record.status_code = status_code
+
+
+def find_idempotency_keys(
+    db: Session, keys: Iterable[str], business_id: Optional[int], scope: str
+) -> Dict[str, IdempotencyKey]:
+    """Registros existentes para varias claves en una sola consulta"""
+    keys = set(keys)
+    if not keys:
+        return {}
+
+    records = db.query(IdempotencyKey).filter(
+        IdempotencyKey.business_id == business_id,
+        IdempotencyKey.scope == scope,
+        IdempotencyKey.key.in_(keys),
+    )
+    return {record.key: record for record in records}
+
+
+def store_idempotency_key(
+    db: Session,
+    key: str,
+    business_id: Optional[int],
+    scope: str,
+    fingerprint: str,
+    response: BaseModel,
+    status_code: int = status.HTTP_200_OK,
+) -> IdempotencyKey:
+    """Registra una clave ya completada (operaciones en lote que validan duplicados antes)"""
+    record = IdempotencyKey(
+        business_id=business_id,
+        scope=scope,
+        key=key,
+        request_hash=fingerprint,
+        expires_at=datetime.now(timezone.utc) + IDEMPOTENCY_TTL,
+    )
+    complete_idempotency_key(record, response, status_code)
+    db.add(record)
+    return record
+
+
+def purge_expired_keys(db: Session) -> int:
+    """Elimina las claves vencidas. Retorna la cantidad eliminada"""
+    deleted = (
+        db.query(IdempotencyKey)
+        .filter(IdempotencyKey.expires_at <= datetime.now(timezone.utc))
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
+
+
+def _find(db: Session, key: str, business_id: Optional[int], scope: str) -> Optional[IdempotencyKey]:
+    return db.query(IdempotencyKey).filter(
+        IdempotencyKey.business_id == business_id,
+        IdempotencyKey.scope == scope,
+        IdempotencyKey.key == key,
+    ).first()
+
+
+def _replay(record: Optional[IdempotencyKey], fingerprint: str) -> Response:
+    """Respuesta guardada de la solicitud original"""
+    if record is None or record.response_body is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="La solicitud original con esta Idempotency-Key aún se está procesando",
+        )
+
+    if record.request_hash != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="La Idempotency-Key ya se usó con una solicitud diferente",
+        )
+
+    return Response(
+        content=record.response_body,
+        status_code=record.status_code,
+        media_type="application/json",
+        headers={"Idempotency-Replayed": "true", "ETag": f'"{record.response_hash}"'},
+    )
@@ -0,0 +1,94 @@
+"""
+Porciones disponibles de cada platillo según el stock de sus ingredientes
+menu_items.portions_available = mínimo sobre los ingredientes de floor(stock / cantidad);
+NULL si el platillo no tiene receta (no depende del inventario).
+Se recalcula solo para los platillos que usan los productos modificados
+(índice inverso producto -> platillos de utils.recipe_cache).
+Los cambios de stock de las órdenes se recalculan desde la outbox, en lote.
+Con MENU_AUTO_AVAILABILITY un platillo sin porciones se apaga y queda marcado
+con auto_disabled; al volver el stock solo se encienden los que apagó el
+sistema, nunca los que el gerente desactivó a mano.
+"""
+import json
+from sqlalchemy import and_, case, func, select, update
+from sqlalchemy.orm import Session
+from typing import Iterable, Optional
+from ..config import settings
+from ..models.menu import MenuItem, menu_item_ingredients
+from ..models.product import Product
+from .outbox import enqueue, outbox_handler
+from .recipe_cache import get_dependents
+from .catalog_snapshot import mark_catalog_stale
+
+
+def _portions_expression():
+    """Subconsulta correlacionada con las porciones del platillo de la fila actualizada"""
+    stock = func.greatest(func.coalesce(Product.stock, 0), 0)
+    return (
+        select(func.min(func.floor(stock / menu_item_ingredients.c.quantity)))
+        .select_from(menu_item_ingredients.join(Product, Product.id == menu_item_ingredients.c.product_id))
+        .where(
+            menu_item_ingredients.c.menu_item_id == MenuItem.id,
+            menu_item_ingredients.c.quantity > 0,
+        )
+        .scalar_subquery()
+    )
+
+
+def refresh_portions(
+    db: Session,
+    product_ids: Optional[Iterable[int]] = None,
+    menu_item_ids: Optional[Iterable[int]] = None,
+) -> None:
+    """
+    Recalcula en un solo UPDATE los platillos indicados y los que usan los productos indicados.
+    Con MENU_AUTO_AVAILABILITY también apaga/enciende is_available según haya porciones.
+    """
+    targets = set(menu_item_ids or ())
+    if product_ids:
+        for dependents in get_dependents(db, product_ids).values():
+            targets.update(dependents)
+    if not targets:
+        return
+
+    portions = _portions_expression()
+    values = {"portions_available": portions}
+    if settings.MENU_AUTO_AVAILABILITY:
+        # Platillos sin receta (portions NULL) no se tocan
+        values["is_available"] = case(
+            (portions == 0, False),
+            (and_(portions > 0, MenuItem.auto_disabled), True),
+            else_=MenuItem.is_available,
+        )
+        values["auto_disabled"] = case(
+            (and_(portions == 0, MenuItem.is_available), True),
+            (portions > 0, False),
+            else_=MenuItem.auto_disabled,
+        )
+
+    db.execute(
+        update(MenuItem)
+        .where(MenuItem.id.in_(targets), MenuItem.deleted_at.is_(None))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def enqueue_stock_change(db: Session, product_ids: Iterable[int]) -> None:
+    """Programa el recálculo de porciones para después del commit (vía outbox)"""
+    enqueue(db, None, "stock_changed", {"product_ids": sorted(set(product_ids))})
+
+
+@outbox_handler("stock_changed")
+def _refresh_changed_stock(db: Session, rows) -> None:
+    """Un solo recálculo para todos los productos del lote"""
+    product_ids = set()
+    for row in rows:
+        product_ids.update(json.loads(row.payload)["product_ids"])
+    refresh_portions(db, product_ids=product_ids)
+    # El stock cambia los productos visibles y las porciones del catálogo público
+    # de los negocios dueños de esos productos
+    business_ids = db.execute(
+        select(Product.business_id).where(Product.id.in_(product_ids)).distinct()
+    ).scalars()
+    mark_catalog_stale(db, business_ids)
@@ -0,0 +1,65 @@
+"""
+Costo de receta de cada platillo
+menu_items.recipe_cost = suma de cantidad * purchase_price de sus ingredientes;
+NULL si el platillo no tiene receta.
+Cuando cambia el precio de compra de un producto se recalculan solo los
+platillos que lo usan (índice inverso de utils.recipe_cache); el recálculo
+completo es un único UPDATE sobre todos los platillos.
+"""
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from typing import Iterable, Optional, Tuple
+from ..models.menu import MenuItem, menu_item_ingredients
+from ..models.product import Product
+from .recipe_cache import get_dependents
+
+
+def _cost_expression():
+    """Subconsulta correlacionada con el costo de la receta del platillo de la fila actualizada"""
+    return (
+        select(func.sum(menu_item_ingredients.c.quantity * func.coalesce(Product.purchase_price, 0)))
+        .select_from(menu_item_ingredients.join(Product, Product.id == menu_item_ingredients.c.product_id))
+        .where(menu_item_ingredients.c.menu_item_id == MenuItem.id)
+        .scalar_subquery()
+    )
+
+
+def refresh_costs(
+    db: Session,
+    product_ids: Optional[Iterable[int]] = None,
+    menu_item_ids: Optional[Iterable[int]] = None,
+) -> None:
+    """Recalcula en un solo UPDATE los platillos indicados y los que usan los productos indicados"""
+    targets = set(menu_item_ids or ())
+    if product_ids:
+        for dependents in get_dependents(db, product_ids).values():
+            targets.update(dependents)
+    if not targets:
+        return
+
+    db.execute(
+        update(MenuItem)
+        .where(MenuItem.id.in_(targets), MenuItem.deleted_at.is_(None))
+        .values(recipe_cost=_cost_expression())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recompute_all_costs(db: Session, business_id: Optional[int]) -> int:
+    """Recalcula el costo de todos los platillos del negocio en una sola pasada. Retorna los actualizados"""
+    result = db.execute(
+        update(MenuItem)
+        .where(MenuItem.business_id == business_id, MenuItem.deleted_at.is_(None))
+        .values(recipe_cost=_cost_expression())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def margin(price: Optional[float], recipe_cost: Optional[float]) -> Tuple[Optional[float], Optional[float]]:
+    """(margen, margen en % del precio); None si el platillo no tiene receta"""
+    if recipe_cost is None or price is None:
+        return None, None
+    value = round(price - recipe_cost, 2)
+    percent = round(value / price * 100, 2) if price > 0 else None
+    return value, percent
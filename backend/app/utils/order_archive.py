@@ -0,0 +1,130 @@
+"""
+Archivo de órdenes históricas
+Las órdenes cerradas (completadas o canceladas) más antiguas que
+ORDER_ARCHIVE_HORIZON_DAYS se mueven con sus items y pagos a orders_archive,
+order_items_archive (particionadas por mes) y order_payments_archive.
+Así las tablas vivas solo guardan los tickets recientes.
+Las estadísticas leen con orders_source/items_source/payments_source, que
+agregan el archivo con UNION ALL solo cuando el negocio tiene órdenes
+archivadas dentro del período (no depende del horizonte configurado, así que
+también es correcto si el archivo se ejecutó con otro --horizon-days).
+"""
+from datetime import datetime
+from sqlalchemy import delete, exists, func, insert, select, text, union_all
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ..models.order import Order, OrderItem, OrderStatus
+from ..models.order_payment import OrderPayment
+from ..models.order_archive import OrderArchive, OrderItemArchive, OrderPaymentArchive
+
+ARCHIVE_BATCH_SIZE = 1000  # Órdenes movidas por transacción
+
+CLOSED_STATUSES = [OrderStatus.COMPLETED.value, OrderStatus.CANCELLED.value]
+
+# Columnas que leen las estadísticas de cada tabla (vivas y archivadas)
+ORDER_COLUMNS = ["id", "business_id", "status", "payment_status", "total", "created_at"]
+ITEM_COLUMNS = ["order_id", "product_id", "menu_item_id", "quantity", "subtotal"]
+PAYMENT_COLUMNS = ["order_id", "payment_method_id", "amount"]
+
+
+def has_archived_orders(db: Session, business_id: Optional[int], since: datetime) -> bool:
+    """Indica si el negocio tiene órdenes archivadas desde `since` (índice business_id, created_at)"""
+    return db.scalar(
+        select(
+            exists().where(
+                OrderArchive.business_id == business_id,
+                OrderArchive.created_at >= since,
+            )
+        )
+    )
+
+
+def _source(db: Session, live_table, archive_table, columns: List[str], business_id: Optional[int], since: datetime, name: str):
+    """Subconsulta con las columnas pedidas; une el archivo si tiene órdenes del período"""
+    live = select(*(live_table.c[column] for column in columns))
+    if not has_archived_orders(db, business_id, since):
+        return live.subquery(name)
+    archived = select(*(archive_table.c[column] for column in columns))
+    return union_all(live, archived).subquery(name)
+
+
+def orders_source(db: Session, business_id: Optional[int], since: datetime):
+    return _source(db, Order.__table__, OrderArchive.__table__, ORDER_COLUMNS, business_id, since, "orders_source")
+
+
+def items_source(db: Session, business_id: Optional[int], since: datetime):
+    return _source(db, OrderItem.__table__, OrderItemArchive.__table__, ITEM_COLUMNS, business_id, since, "items_source")
+
+
+def payments_source(db: Session, business_id: Optional[int], since: datetime):
+    return _source(db, OrderPayment.__table__, OrderPaymentArchive.__table__, PAYMENT_COLUMNS, business_id, since, "payments_source")
+
+
+def archive_orders_batch(db: Session, cutoff: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Mueve un bloque de órdenes cerradas anteriores a `cutoff` en una sola transacción.
+    Retorna la cantidad movida (0 cuando no queda nada por archivar).
+    Cada bloque es atómico: si el proceso se interrumpe basta con volver a ejecutarlo.
+    """
+    order_ids = db.execute(
+        select(Order.id)
+        .where(Order.created_at < cutoff, Order.status.in_(CLOSED_STATUSES))
+        .order_by(Order.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not order_ids:
+        return 0
+
+    _ensure_partitions(db, order_ids)
+
+    orders = Order.__table__
+    order_columns = [column.name for column in orders.c]
+    db.execute(
+        insert(OrderArchive.__table__).from_select(
+            order_columns, select(*orders.c).where(orders.c.id.in_(order_ids))
+        )
+    )
+
+    items = OrderItem.__table__
+    item_columns = [column.name for column in items.c]
+    db.execute(
+        insert(OrderItemArchive.__table__).from_select(
+            item_columns + ["order_created_at"],
+            select(*items.c, orders.c.created_at)
+            .join(orders, orders.c.id == items.c.order_id)
+            .where(items.c.order_id.in_(order_ids)),
+        )
+    )
+
+    payments = OrderPayment.__table__
+    payment_columns = [column.name for column in payments.c]
+    db.execute(
+        insert(OrderPaymentArchive.__table__).from_select(
+            payment_columns, select(*payments.c).where(payments.c.order_id.in_(order_ids))
+        )
+    )
+
+    db.execute(delete(OrderPayment).where(OrderPayment.order_id.in_(order_ids)))
+    db.execute(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+    db.execute(delete(Order).where(Order.id.in_(order_ids)))
+    db.commit()
+    return len(order_ids)
+
+
+def _ensure_partitions(db: Session, order_ids: List[int]) -> None:
+    """Crea las particiones mensuales que necesita el bloque (si no existen)"""
+    month = func.date_trunc("month", Order.created_at)
+    months = db.execute(
+        select(month.label("start"), (month + text("interval '1 month'")).label("end"))
+        .where(Order.id.in_(order_ids))
+        .distinct()
+    ).all()
+
+    for start, end in months:
+        suffix = start.strftime("y%Ym%m")
+        for table in ("orders_archive", "order_items_archive"):
+            db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {table}_{suffix} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
@@ -0,0 +1,201 @@
+"""
+Bus de eventos de órdenes en memoria para las pantallas de cocina (SSE)
+Cada negocio tiene un buffer circular con sus últimos eventos, así un cliente
+que se reconecta con Last-Event-ID recibe solo lo que se perdió.
+Los ids tienen la forma "<arranque>-<secuencia>": si el proceso se reinició o
+el evento ya salió del buffer se envía un evento "reset" para recargar todo.
+
+Con varios procesos (workers de uvicorn) la outbox se procesa en uno solo:
+broadcast() avisa con NOTIFY de PostgreSQL (al confirmar la transacción) y el
+OrderEventListener de cada proceso hace LISTEN, carga las órdenes con el
+cargador registrado con @order_event_loader y publica a sus clientes SSE.
+Un cliente que reconecta en otro proceso recibe "reset" (otro arranque).
+"""
+import asyncio
+import itertools
+import json
+import select
+import threading
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from ..database import SessionLocal, engine
+
+BUFFER_SIZE = 500  # Eventos guardados por negocio para reanudar
+NOTIFY_CHANNEL = "order_events"
+NOTIFY_CHUNK = 100  # Eventos por NOTIFY (el payload de PostgreSQL admite hasta 8000 bytes)
+
+Event = Tuple[int, str, str]  # (secuencia, tipo, datos JSON)
+Loader = Callable[[Session, List[Tuple[str, int]]], List[Tuple[str, Any]]]  # [(tipo, order_id)] -> [(tipo, datos)]
+
+
+class OrderEventBus:
+    def __init__(self, buffer_size: int = BUFFER_SIZE):
+        self.boot_id = uuid.uuid4().hex[:8]
+        self._buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._sequences: Dict[int, itertools.count] = {}  # Secuencia propia por negocio
+        self._buffers: Dict[int, deque] = {}
+        self._subscribers: Dict[int, set] = {}
+
+    def publish(self, business_id: Optional[int], event_type: str, data: Any) -> None:
+        """Publica un evento para el negocio (seguro desde rutas síncronas / hilos)"""
+        self.publish_many(business_id, [(event_type, data)])
+
+    def publish_many(self, business_id: Optional[int], events: List[Tuple[str, Any]]) -> None:
+        """Publica varios eventos de una vez con un solo aviso a cada suscriptor"""
+        if not events:
+            return
+
+        with self._lock:
+            buffer = self._buffers.setdefault(business_id, deque(maxlen=self._buffer_size))
+            sequence = self._sequences.setdefault(business_id, itertools.count(1))
+            published = []
+            for event_type, data in events:
+                event = (next(sequence), event_type, json.dumps(data, default=str))
+                buffer.append(event)
+                published.append(event)
+            subscribers = list(self._subscribers.get(business_id, ()))
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_put_all, queue, published)
+            except RuntimeError:
+                # El event loop del suscriptor ya se cerró
+                self._discard(business_id, (loop, queue))
+
+    def subscribe(self, business_id: Optional[int], last_event_id: Optional[str] = None):
+        """
+        Registra un suscriptor en el event loop actual.
+        Retorna (cola, eventos pendientes, requiere_reset).
+        """
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            buffer = list(self._buffers.get(business_id, ()))
+            self._subscribers.setdefault(business_id, set()).add(subscriber)
+
+        backlog, reset = self._backlog(buffer, last_event_id)
+        return subscriber, backlog, reset
+
+    def unsubscribe(self, business_id: Optional[int], subscriber) -> None:
+        self._discard(business_id, subscriber)
+
+    def reset_all(self) -> None:
+        """Pide a todos los clientes conectados recargar (p. ej. si se perdieron avisos)"""
+        with self._lock:
+            business_ids = [business_id for business_id, subscribers in self._subscribers.items() if subscribers]
+        for business_id in business_ids:
+            self.publish(business_id, "reset", {})
+
+    def event_id(self, sequence: int) -> str:
+        return f"{self.boot_id}-{sequence}"
+
+    def _backlog(self, buffer: List[Event], last_event_id: Optional[str]):
+        """Eventos posteriores a last_event_id; reset si no se puede reanudar"""
+        if not last_event_id:
+            return [], False
+
+        boot_id, _, sequence = last_event_id.partition("-")
+        if boot_id != self.boot_id or not sequence.isdigit():
+            return [], True
+
+        sequence = int(sequence)
+        # Si el primer evento del buffer no es el siguiente al último visto, se perdieron eventos
+        if buffer and buffer[0][0] > sequence + 1:
+            return [], True
+        return [event for event in buffer if event[0] > sequence], False
+
+    def _discard(self, business_id: Optional[int], subscriber) -> None:
+        with self._lock:
+            self._subscribers.get(business_id, set()).discard(subscriber)
+
+
+def _put_all(queue: asyncio.Queue, events: List[Event]) -> None:
+    for event in events:
+        queue.put_nowait(event)
+
+
+order_events = OrderEventBus()
+
+_loader: Optional[Loader] = None
+
+
+def order_event_loader(loader: Loader) -> Loader:
+    """Registra la función que convierte (tipo, order_id) en los datos del evento"""
+    global _loader
+    _loader = loader
+    return loader
+
+
+def broadcast(db: Session, business_id: Optional[int], events: List[Tuple[str, int]]) -> None:
+    """Envía los eventos a todos los procesos; sin PostgreSQL se publican solo en este"""
+    if db.get_bind().dialect.name != "postgresql":
+        order_events.publish_many(business_id, _loader(db, events))
+        return
+    for start in range(0, len(events), NOTIFY_CHUNK):
+        payload = json.dumps({"business_id": business_id, "events": events[start:start + NOTIFY_CHUNK]})
+        db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": NOTIFY_CHANNEL, "payload": payload})
+
+
+class OrderEventListener:
+    """Hilo que recibe los NOTIFY de order_events y publica en el bus de este proceso"""
+
+    def __init__(self, poll_interval: float = 5.0, retry_interval: float = 5.0):
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread or engine.dialect.name != "postgresql":
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="order-events-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                print(f"❌ Error en el listener de eventos de órdenes: {e}")
+                # Los avisos enviados mientras no se escuchaba se perdieron
+                order_events.reset_all()
+                self._stopping.wait(self.retry_interval)
+
+    def _listen(self) -> None:
+        """Conexión dedicada en autocommit con LISTEN; se descarta al salir"""
+        connection = engine.raw_connection()
+        try:
+            driver = connection.driver_connection
+            driver.autocommit = True
+            with driver.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            while not self._stopping.is_set():
+                if select.select([driver], [], [], self.poll_interval) == ([], [], []):
+                    continue
+                driver.poll()
+                notifies = list(driver.notifies)
+                driver.notifies.clear()
+                if notifies:
+                    self._deliver(notify.payload for notify in notifies)
+        finally:
+            connection.invalidate()
+
+    def _deliver(self, payloads) -> None:
+        with SessionLocal() as db:
+            for payload in payloads:
+                message = json.loads(payload)
+                events = [tuple(event) for event in message["events"]]
+                order_events.publish_many(message["business_id"], _loader(db, events))
+
+
+order_event_listener = OrderEventListener()
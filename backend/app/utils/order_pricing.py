@@ -0,0 +1,181 @@
+"""
+Cálculo de precios y reserva de stock para órdenes
+Carga todos los productos y platillos referenciados por las líneas de una
+orden en un número fijo de consultas (un IN (...) por tipo de entidad), solo
+del negocio del usuario; las recetas salen de utils.recipe_cache.
+El descuento de stock se aplica con las operaciones atómicas de utils.stock
+"""
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+from ..models.menu import MenuItem
+from ..models.order import OrderItem
+from ..models.product import Product
+from .recipe_cache import Recipe, get_recipes
+
+
+def line_source(line) -> Optional[Tuple[str, int]]:
+    """Retorna (source_type, id) de una línea de orden o None si no referencia nada"""
+    if line.source_type == "menu" and line.menu_item_id:
+        return "menu", line.menu_item_id
+    if line.product_id:
+        return "product", line.product_id
+    return None
+
+
+class OrderCatalog:
+    """Productos, platillos y recetas referenciados por un conjunto de líneas"""
+
+    def __init__(
+        self,
+        products: Dict[int, Product],
+        menu_items: Dict[int, MenuItem],
+        recipes: Dict[int, Recipe],
+    ):
+        self.products = products  # product_id -> Product
+        self.menu_items = menu_items  # menu_item_id -> MenuItem
+        self.recipes = recipes  # menu_item_id -> ((product_id, cantidad por porción), ...)
+
+    def components(self, source_type: str, source_id: int) -> Recipe:
+        """Productos de inventario que consume una unidad de la línea"""
+        if source_type == "menu":
+            return self.recipes.get(source_id, ())
+        return ((source_id, 1.0),)
+
+
+def load_order_catalog(db: Session, lines: List, business_id: Optional[int]) -> OrderCatalog:
+    """Carga productos y platillos del negocio para todas las líneas; las recetas salen de la caché"""
+    product_ids = set()
+    menu_item_ids = set()
+    for line in lines:
+        source = line_source(line)
+        if source is None:
+            continue
+        if source[0] == "menu":
+            menu_item_ids.add(source[1])
+        else:
+            product_ids.add(source[1])
+
+    menu_items = {}
+    recipes = {}
+    if menu_item_ids:
+        menu_items = {
+            item.id: item
+            for item in db.query(MenuItem).filter(
+                MenuItem.id.in_(menu_item_ids),
+                MenuItem.business_id == business_id,
+            )
+        }
+        # Recetas solo de los platillos del negocio (los ajenos se reportan como no encontrados)
+        recipes = get_recipes(db, menu_items.keys()) if menu_items else {}
+        for recipe in recipes.values():
+            product_ids.update(product_id for product_id, _ in recipe)
+
+    products = {}
+    if product_ids:
+        products = {
+            product.id: product
+            for product in db.query(Product).filter(
+                Product.id.in_(product_ids),
+                Product.business_id == business_id,
+            )
+        }
+
+    return OrderCatalog(products, menu_items, recipes)
+
+
+def build_order_items(catalog: OrderCatalog, lines: List) -> Tuple[List[OrderItem], float]:
+    """Valida y valoriza las líneas en memoria. Retorna (items, subtotal)"""
+    order_items = []
+    subtotal = 0
+
+    for item_data in lines:
+        source = line_source(item_data)
+        if source is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Debe proporcionar product_id o menu_item_id",
+            )
+        source_type, source_id = source
+
+        if source_type == "menu":
+            menu_item = catalog.menu_items.get(source_id)
+            if not menu_item:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Item de menú con ID {source_id} no encontrado",
+                )
+
+            if not menu_item.is_available:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"El item '{menu_item.name}' no está disponible",
+                )
+
+            unit_price = menu_item.price
+            item_subtotal = unit_price * item_data.quantity
+            order_items.append(OrderItem(
+                menu_item_id=source_id,
+                source_type="menu",
+                quantity=item_data.quantity,
+                unit_price=unit_price,
+                subtotal=item_subtotal,
+                notes=item_data.notes,
+            ))
+        else:
+            product = catalog.products.get(source_id)
+            if not product:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Producto con ID {source_id} no encontrado",
+                )
+
+            unit_price = product.sale_price
+            item_subtotal = unit_price * item_data.quantity
+            order_items.append(OrderItem(
+                product_id=source_id,
+                source_type="product",
+                quantity=item_data.quantity,
+                unit_price=unit_price,
+                subtotal=item_subtotal,
+                notes=item_data.notes,
+            ))
+
+        subtotal += item_subtotal
+
+    return order_items, subtotal
+
+
+def stock_demand(catalog: OrderCatalog, lines: List) -> Dict[int, float]:
+    """Cantidad total de cada producto de inventario que consumen las líneas"""
+    quantities = {}
+    for line in lines:
+        source = line_source(line)
+        if source is not None:
+            quantities[source] = quantities.get(source, 0) + line.quantity
+    return source_demand(catalog, quantities)
+
+
+def source_demand(catalog: OrderCatalog, quantities: Dict[Tuple[str, int], float]) -> Dict[int, float]:
+    """Explota cantidades por (source_type, id) a cantidades por producto (admite negativas)"""
+    demand = {}
+    for source, quantity in quantities.items():
+        for product_id, per_unit in catalog.components(*source):
+            demand[product_id] = demand.get(product_id, 0) + per_unit * quantity
+    return demand
+
+
+def shortage_detail(catalog: OrderCatalog, product_id: int, lines: List) -> str:
+    """Mensaje de stock insuficiente indicando el platillo que requiere el ingrediente"""
+    product = catalog.products.get(product_id)
+    if product is None:
+        return f"Stock insuficiente para el producto con ID {product_id}"
+
+    for line in lines:
+        source = line_source(line)
+        if source is None or source[0] != "menu":
+            continue
+        menu_item = catalog.menu_items.get(source[1])
+        if menu_item and any(pid == product.id for pid, _ in catalog.components(*source)):
+            return f"Stock insuficiente del ingrediente '{product.name}' para '{menu_item.name}'"
+    return f"Stock insuficiente para {product.name}"
@@ -0,0 +1,168 @@
+"""
+Outbox transaccional de órdenes
+Las rutas registran los efectos secundarios (mesas, eventos de cocina, ...)
+con enqueue() dentro de la misma transacción que la orden; un pool de hilos
+los procesa en lotes después del commit.
+Cada hilo atiende un subconjunto de negocios (business_id % hilos), así los
+eventos de un negocio se procesan en orden aunque haya varios hilos.
+Los manejadores se registran con @outbox_handler y reciben una secuencia
+consecutiva de filas del mismo manejador.
+"""
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal
+from ..models.order_outbox import OrderOutbox
+from .idempotency import purge_expired_keys
+
+OUTBOX_BATCH_SIZE = 200  # Filas tomadas por hilo en cada vuelta
+OUTBOX_MAX_ATTEMPTS = 5  # Después se marca como procesada con last_error
+OUTBOX_RETENTION = timedelta(days=1)  # Filas procesadas que se conservan para diagnóstico
+MAINTENANCE_INTERVAL = 600  # Segundos entre limpiezas (outbox e idempotency_keys)
+
+Handler = Callable[[Session, List[OrderOutbox]], None]
+
+_handlers: Dict[str, Handler] = {}
+
+
+def outbox_handler(*event_types: str):
+    """Registra la función que procesa los tipos de evento indicados"""
+    def register(handler: Handler) -> Handler:
+        for event_type in event_types:
+            _handlers[event_type] = handler
+        return handler
+    return register
+
+
+def enqueue(db: Session, business_id: Optional[int], event_type: str, payload: Dict[str, Any]) -> None:
+    """Agrega un efecto secundario a la transacción actual (se procesa después del commit)"""
+    db.add(OrderOutbox(business_id=business_id, event_type=event_type, payload=json.dumps(payload)))
+    db.info["outbox_pending"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_workers(session: Session) -> None:
+    """Despierta a los hilos apenas se confirma una transacción con efectos pendientes"""
+    if session.info.pop("outbox_pending", False):
+        outbox_workers.notify()
+
+
+def drain_outbox(db: Session, shard: int = 0, shards: int = 1, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Procesa un lote de filas pendientes del shard. Retorna la cantidad tomada"""
+    now = datetime.now(timezone.utc)
+    rows = (
+        db.query(OrderOutbox)
+        .filter(
+            OrderOutbox.processed_at.is_(None),
+            OrderOutbox.available_at <= now,
+            func.coalesce(OrderOutbox.business_id, 0) % shards == shard,
+        )
+        .order_by(OrderOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not rows:
+        db.rollback()
+        return 0
+
+    # Filas consecutivas del mismo manejador se procesan juntas, respetando el orden
+    for handler, group in groupby(rows, key=lambda row: _handlers.get(row.event_type)):
+        group = list(group)
+        if handler is None:
+            _mark_failed(group, "Tipo de evento sin manejador", now, retry=False)
+            continue
+        try:
+            with db.begin_nested():
+                handler(db, group)
+        except Exception as e:
+            _mark_failed(group, repr(e), now, retry=True)
+            continue
+        for row in group:
+            row.processed_at = now
+
+    db.commit()
+    return len(rows)
+
+
+def _mark_failed(rows: List[OrderOutbox], error: str, now: datetime, retry: bool) -> None:
+    """Reintento con espera exponencial; al agotar los intentos queda como procesada con el error"""
+    for row in rows:
+        row.attempts += 1
+        row.last_error = error
+        if retry and row.attempts < OUTBOX_MAX_ATTEMPTS:
+            row.available_at = now + timedelta(seconds=2 ** row.attempts)
+        else:
+            row.processed_at = now
+            print(f"❌ Outbox {row.event_type} #{row.id} descartado: {error}")
+
+
+def purge_processed(db: Session) -> int:
+    """Elimina las filas procesadas más antiguas que OUTBOX_RETENTION"""
+    deleted = (
+        db.query(OrderOutbox)
+        .filter(OrderOutbox.processed_at <= datetime.now(timezone.utc) - OUTBOX_RETENTION)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
+
+
+class OutboxWorkerPool:
+    """Hilos en segundo plano que vacían la outbox (se inician con la aplicación)"""
+
+    def __init__(self, size: int, poll_interval: float = 1.0):
+        self.size = size
+        self.poll_interval = poll_interval  # Respaldo por si se pierde un aviso (p. ej. otro proceso)
+        self._wakeups = [threading.Event() for _ in range(size)]
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stopping.clear()
+        for shard in range(self.size):
+            thread = threading.Thread(target=self._run, args=(shard,), name=f"outbox-{shard}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        self.notify()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        for wakeup in self._wakeups:
+            wakeup.set()
+
+    def _run(self, shard: int) -> None:
+        wakeup = self._wakeups[shard]
+        next_maintenance = datetime.now(timezone.utc)
+        while not self._stopping.is_set():
+            wakeup.clear()
+            try:
+                with SessionLocal() as db:
+                    taken = drain_outbox(db, shard, self.size)
+                    # El primer hilo hace la limpieza periódica
+                    if shard == 0 and datetime.now(timezone.utc) >= next_maintenance:
+                        purge_processed(db)
+                        purge_expired_keys(db)
+                        next_maintenance = datetime.now(timezone.utc) + timedelta(seconds=MAINTENANCE_INTERVAL)
+            except Exception as e:
+                print(f"❌ Error en el worker de outbox {shard}: {e}")
+                taken = 0
+
+            # Lote completo: probablemente quedan más filas, seguir sin esperar
+            if taken < OUTBOX_BATCH_SIZE:
+                wakeup.wait(self.poll_interval)
+
+
+outbox_workers = OutboxWorkerPool(settings.OUTBOX_WORKERS)
@@ -0,0 +1,78 @@
+"""
+Caché en memoria de recetas (lista de materiales) de los platillos del menú
+menu_item_id -> ((product_id, cantidad por porción), ...)
+y su índice inverso product_id -> (menu_item_id, ...), para que los cambios de
+un producto (stock, precio) lleguen solo a los platillos que lo usan.
+Las recetas casi nunca cambian: se cargan una vez y se invalidan desde el
+router de menú después de confirmar cambios en los ingredientes. Con varios
+procesos la invalidación es local: las entradas vencen después de
+RECIPE_CACHE_TTL segundos para que los demás procesos lean la receta nueva.
+"""
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, Tuple
+from ..models.menu import menu_item_ingredients
+from .ttl_cache import TTLCache
+
+Recipe = Tuple[Tuple[int, float], ...]
+
+RECIPE_CACHE_TTL = 60  # Segundos
+
+_recipes = TTLCache(ttl=RECIPE_CACHE_TTL)  # menu_item_id -> Recipe
+_dependents = TTLCache(ttl=RECIPE_CACHE_TTL)  # product_id -> platillos que lo usan
+
+
+def get_recipes(db: Session, menu_item_ids: Iterable[int]) -> Dict[int, Recipe]:
+    """Retorna las recetas pedidas; las que faltan se cargan en una sola consulta"""
+    menu_item_ids = set(menu_item_ids)
+    found, generation = _recipes.lookup_many(menu_item_ids)
+
+    missing = menu_item_ids - found.keys()
+    if not missing:
+        return found
+
+    loaded = {mid: [] for mid in missing}
+    rows = db.execute(
+        select(
+            menu_item_ingredients.c.menu_item_id,
+            menu_item_ingredients.c.product_id,
+            menu_item_ingredients.c.quantity,
+        ).where(menu_item_ingredients.c.menu_item_id.in_(missing))
+    )
+    for menu_item_id, product_id, quantity in rows:
+        loaded[menu_item_id].append((product_id, quantity))
+    loaded = {mid: tuple(components) for mid, components in loaded.items()}
+    _recipes.store_many(loaded, generation)
+
+    found.update(loaded)
+    return found
+
+
+def get_dependents(db: Session, product_ids: Iterable[int]) -> Dict[int, Tuple[int, ...]]:
+    """Platillos que usan cada producto; los que faltan se cargan en una sola consulta"""
+    product_ids = set(product_ids)
+    found, generation = _dependents.lookup_many(product_ids)
+
+    missing = product_ids - found.keys()
+    if not missing:
+        return found
+
+    loaded = {pid: [] for pid in missing}
+    rows = db.execute(
+        select(menu_item_ingredients.c.product_id, menu_item_ingredients.c.menu_item_id)
+        .where(menu_item_ingredients.c.product_id.in_(missing))
+    )
+    for product_id, menu_item_id in rows:
+        loaded[product_id].append(menu_item_id)
+    loaded = {pid: tuple(sorted(menu_items)) for pid, menu_items in loaded.items()}
+    _dependents.store_many(loaded, generation)
+
+    found.update(loaded)
+    return found
+
+
+def invalidate_recipes(*menu_item_ids: int) -> None:
+    """Descarta las recetas indicadas (o todas si no se indica ninguna)"""
+    _recipes.invalidate(*menu_item_ids)
+    # Un cambio de receta puede agregar o quitar productos: el índice inverso se reconstruye
+    _dependents.invalidate()
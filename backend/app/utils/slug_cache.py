@@ -0,0 +1,59 @@
+"""
+Caché en memoria slug -> negocio para el catálogo público
+Cada escaneo del QR de una mesa dispara varias rutas /public/{slug}/... a la
+vez; todas resuelven el mismo slug. Se guardan como máximo SLUG_CACHE_SIZE
+slugs (LRU) durante SLUG_CACHE_TTL segundos. Los slugs inexistentes también
+se guardan (por menos tiempo) para absorber bots que prueban slugs al azar.
+Se invalida desde configuration y auth.register después de confirmar cambios;
+con varios procesos las entradas vencen por TTL.
+"""
+from sqlalchemy.orm import Session
+from typing import NamedTuple, Optional
+from ..models.configuration import BusinessConfiguration
+from .ttl_cache import MISSING, TTLCache
+
+SLUG_CACHE_SIZE = 1024
+SLUG_CACHE_TTL = 300  # Segundos
+SLUG_NEGATIVE_TTL = 30  # Segundos para slugs que no existen
+
+
+class PublicBusiness(NamedTuple):
+    id: int
+    business_name: str
+    slug: str
+    phone: Optional[str]
+    email: Optional[str]
+    address: Optional[str]
+    logo_url: Optional[str]
+    currency: Optional[str]
+
+
+_cache = TTLCache(ttl=SLUG_CACHE_TTL, max_size=SLUG_CACHE_SIZE)  # slug -> negocio o None
+
+
+def get_business_by_slug(db: Session, slug: str) -> Optional[PublicBusiness]:
+    """Negocio del slug (desde la caché o con una consulta); None si no existe"""
+    cached, generation = _cache.lookup(slug)
+    if cached is not MISSING:
+        return cached
+
+    row = db.query(
+        BusinessConfiguration.id,
+        BusinessConfiguration.business_name,
+        BusinessConfiguration.slug,
+        BusinessConfiguration.phone,
+        BusinessConfiguration.email,
+        BusinessConfiguration.address,
+        BusinessConfiguration.logo_url,
+        BusinessConfiguration.currency,
+    ).filter(BusinessConfiguration.slug == slug).first()
+    business = PublicBusiness(*row) if row else None
+    _cache.store(slug, business, generation, ttl=SLUG_CACHE_TTL if business else SLUG_NEGATIVE_TTL)
+    return business
+
+
+def invalidate_slugs(*slugs: Optional[str]) -> None:
+    """Descarta los slugs indicados (el anterior y el nuevo al cambiar un slug)"""
+    slugs = [slug for slug in slugs if slug]
+    if slugs:
+        _cache.invalidate(*slugs)
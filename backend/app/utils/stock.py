@@ -0,0 +1,61 @@
+"""
+Operaciones atómicas de stock sobre products
+Cada operación es un único UPDATE ... FROM (VALUES ...) que aplica todas las
+líneas a la vez, sin leer el stock en Python ni bloquear filas de antemano.
+Las porciones disponibles de los platillos afectados se recalculan después
+del commit (utils.menu_availability)
+"""
+from sqlalchemy import Float, Integer, column, update, values
+from sqlalchemy.orm import Session
+from typing import Dict, List, Tuple
+from ..models.product import Product
+from .menu_availability import enqueue_stock_change
+
+
+def _quantities(changes: Dict[int, float]):
+    """Tabla VALUES (id, qty) con las cantidades por producto"""
+    return values(
+        column("id", Integer), column("qty", Float), name="stock_changes"
+    ).data(list(changes.items()))
+
+
+def reserve_stock(db: Session, demand: Dict[int, float]) -> Tuple[Dict[int, float], List[int]]:
+    """
+    Descuenta stock solo donde alcanza: UPDATE ... WHERE stock >= qty RETURNING stock.
+    Retorna (stock restante por producto, productos sin stock suficiente).
+    Si hay productos fallidos el llamador debe hacer rollback de la transacción.
+    """
+    changes = {product_id: qty for product_id, qty in demand.items() if qty > 0}
+    if not changes:
+        return {}, []
+
+    lines = _quantities(changes)
+    rows = db.execute(
+        update(Product)
+        .where(Product.id == lines.c.id, Product.stock >= lines.c.qty)
+        .values(stock=Product.stock - lines.c.qty)
+        .returning(Product.id, Product.stock)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    remaining = {product_id: stock for product_id, stock in rows}
+    failed = [product_id for product_id in changes if product_id not in remaining]
+    if not failed:
+        enqueue_stock_change(db, changes)
+    return remaining, failed
+
+
+def release_stock(db: Session, quantities: Dict[int, float]) -> None:
+    """Devuelve stock al inventario (sin condición) en un solo UPDATE"""
+    changes = {product_id: qty for product_id, qty in quantities.items() if qty > 0}
+    if not changes:
+        return
+
+    lines = _quantities(changes)
+    db.execute(
+        update(Product)
+        .where(Product.id == lines.c.id)
+        .values(stock=Product.stock + lines.c.qty)
+        .execution_options(synchronize_session=False)
+    )
+    enqueue_stock_change(db, changes)
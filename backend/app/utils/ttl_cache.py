@@ -0,0 +1,92 @@
+"""
+Caché en memoria compartida por las cachés de la aplicación (negocios, slugs,
+recetas, catálogo público)
+Cada entrada vence después de `ttl` segundos: con varios procesos la
+invalidación es local y el vencimiento hace que los demás procesos también se
+actualicen. Con `max_size` se descartan las entradas menos usadas (LRU).
+Las lecturas devuelven un número de generación; una carga hecha con ese número
+solo se guarda si no hubo invalidaciones mientras se consultaba la base.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+MISSING = object()  # Valor de lookup() cuando la clave no está (None puede ser un valor guardado)
+
+
+class TTLCache:
+    def __init__(self, ttl: Optional[float] = None, max_size: Optional[int] = None):
+        self.ttl = ttl  # Segundos; None = sin vencimiento
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()  # clave -> (valor, vence)
+        self._generation = 0
+
+    def _get(self, key: Hashable, now: float) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        value, expires = entry
+        if expires is not None and expires <= now:
+            del self._entries[key]
+            return MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def lookup(self, key: Hashable) -> Tuple[Any, int]:
+        """(valor o MISSING, generación para store())"""
+        with self._lock:
+            return self._get(key, time.monotonic()), self._generation
+
+    def lookup_many(self, keys: Iterable[Hashable]) -> Tuple[Dict[Hashable, Any], int]:
+        """(claves encontradas -> valor, generación para store_many())"""
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                value = self._get(key, now)
+                if value is not MISSING:
+                    found[key] = value
+            return found, self._generation
+
+    def store(self, key: Hashable, value: Any, generation: int, ttl: Optional[float] = None) -> None:
+        self.store_many({key: value}, generation, ttl)
+
+    def store_many(self, items: Dict[Hashable, Any], generation: int, ttl: Optional[float] = None) -> None:
+        """Guarda lo cargado, salvo que haya habido una invalidación desde lookup()"""
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if generation != self._generation:
+                return
+            for key, value in items.items():
+                self._entries[key] = (value, expires)
+                self._entries.move_to_end(key)
+            if self.max_size is not None:
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Valor guardado o el resultado de load() (que se guarda para las siguientes lecturas)"""
+        value, generation = self.lookup(key)
+        if value is MISSING:
+            value = load()
+            self.store(key, value, generation, ttl)
+        return value
+
+    def invalidate(self, *keys: Hashable) -> None:
+        """Descarta las claves indicadas (o todas si no se indica ninguna)"""
+        with self._lock:
+            self._generation += 1
+            if not keys:
+                self._entries.clear()
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Descarta las claves para las que predicate(clave) es verdadero"""
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
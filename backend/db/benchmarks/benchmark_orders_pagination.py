@@ -0,0 +1,102 @@
+"""
+Benchmark: latencia de páginas de GET /orders (cursor vs offset)
+Usa la base de datos de DATABASE_URL: ejecutar SOLO contra una base de pruebas
+
+Ejecutar desde la raíz del backend:
+    python db/benchmarks/benchmark_orders_pagination.py --seed 1000000
+    python db/benchmarks/benchmark_orders_pagination.py --depths 0 10000 100000 999000
+"""
+import argparse
+import statistics
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import SessionLocal, engine
+from app.models.order import Order, OrderStatus
+from app.models.user import User
+from app.routers.orders import _orders_query, _apply_order_filters, _page_orders, _encode_cursor
+
+
+def seed(total: int):
+    """Inserta `total` órdenes sintéticas (una cada 30 segundos hacia atrás)"""
+    print(f"🔧 Insertando {total} órdenes de prueba...")
+    with engine.begin() as connection:
+        user = connection.execute(text("SELECT id, business_id FROM users ORDER BY id LIMIT 1")).first()
+        if user is None:
+            raise SystemExit("❌ Se necesita al menos un usuario (ejecuta init_db.py)")
+
+        connection.execute(text("""
+            INSERT INTO orders (user_id, business_id, status, payment_status, subtotal, tax, discount, total, created_at)
+            SELECT :user_id, :business_id,
+                   (ARRAY['pending', 'preparing', 'completed', 'cancelled'])[1 + g % 4],
+                   (ARRAY['pending', 'partial', 'paid'])[1 + g % 3],
+                   10, 1.6, 0, 11.6,
+                   now() - g * interval '30 seconds'
+            FROM generate_series(1, :total) AS g
+        """), {"user_id": user.id, "business_id": user.business_id, "total": total})
+        connection.execute(text("ANALYZE orders"))
+    print("✅ Órdenes insertadas")
+
+
+def timed(fn, db, runs: int) -> float:
+    """Mediana en milisegundos de `runs` ejecuciones"""
+    samples = []
+    for _ in range(runs):
+        db.expunge_all()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def benchmark(depths, limit: int, runs: int):
+    db = SessionLocal()
+    try:
+        # Se mide con el negocio del primer usuario, igual que las órdenes de --seed
+        business_id = db.query(User.business_id).order_by(User.id).limit(1).scalar()
+        total = db.query(Order).filter(Order.business_id == business_id).count()
+        print(f"\n📊 {total} órdenes, páginas de {limit}, mediana de {runs} ejecuciones\n")
+        print(f"{'posición':>10} | {'cursor (ms)':>12} | {'cursor+status (ms)':>18} | {'offset (ms)':>12}")
+        print("-" * 62)
+
+        for depth in depths:
+            # La orden ancla se busca una sola vez, fuera de la medición
+            anchor = (
+                db.query(Order)
+                .filter(Order.business_id == business_id)
+                .order_by(Order.created_at.desc(), Order.id.desc())
+                .offset(depth)
+                .first()
+            )
+            if anchor is None:
+                break
+            cursor = _encode_cursor(anchor)
+
+            keyset_ms = timed(lambda: _page_orders(_orders_query(db, business_id), cursor, 0, limit).all(), db, runs)
+            filtered_ms = timed(
+                lambda: _page_orders(
+                    _apply_order_filters(_orders_query(db, business_id), status_filter=OrderStatus.PENDING),
+                    cursor, 0, limit,
+                ).all(),
+                db, runs,
+            )
+            offset_ms = timed(lambda: _page_orders(_orders_query(db, business_id), None, depth, limit).all(), db, runs)
+            print(f"{depth:>10} | {keyset_ms:>12.2f} | {filtered_ms:>18.2f} | {offset_ms:>12.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de paginación de órdenes")
+    parser.add_argument("--seed", type=int, default=0, help="Órdenes de prueba a insertar antes de medir")
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 1000, 10000, 100000, 500000, 999000])
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+    benchmark(args.depths, args.limit, args.runs)
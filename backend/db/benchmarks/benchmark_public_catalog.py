@@ -0,0 +1,145 @@
+"""
+Benchmark: consultas del catálogo público con muchos negocios
+Mide la construcción del catálogo de un negocio (productos, menú y categorías,
+como GET /public/{slug}/catalog sin caché) contra las consultas anteriores sin
+filtro de negocio, y muestra el plan de la consulta de productos.
+Usa la base de datos de DATABASE_URL: ejecutar SOLO contra una base de pruebas
+
+Ejecutar desde la raíz del backend:
+    python db/benchmarks/benchmark_public_catalog.py --seed 500
+    python db/benchmarks/benchmark_public_catalog.py --samples 50
+"""
+import argparse
+import random
+import statistics
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import SessionLocal, engine
+from app.models.product import Product
+from app.models.menu import MenuItem, MenuCategory
+from app.utils.catalog_snapshot import _build
+
+SEED_PREFIX = "bench-"  # Negocios de prueba (slug bench-N)
+
+
+def seed(tenants: int, products: int, menu_items: int, categories: int):
+    """Inserta `tenants` negocios con sus productos, platillos y categorías del menú"""
+    print(f"🔧 Insertando {tenants} negocios de prueba...")
+    with engine.begin() as connection:
+        connection.execute(text("""
+            INSERT INTO business_configuration (business_name, slug, tax_rate, currency)
+            SELECT 'Negocio ' || g, :prefix || g, 16, 'USD'
+            FROM generate_series(1, :tenants) AS g
+        """), {"prefix": SEED_PREFIX, "tenants": tenants})
+
+        connection.execute(text("""
+            INSERT INTO categories (name, business_id)
+            SELECT 'General ' || b.slug, b.id
+            FROM business_configuration b WHERE b.slug LIKE :prefix || '%'
+        """), {"prefix": SEED_PREFIX})
+
+        # Un tercio de los productos visibles en el catálogo, 10% sin stock, 5% eliminados
+        connection.execute(text("""
+            INSERT INTO products (name, category_id, business_id, unit_type, purchase_price, sale_price,
+                                  stock, min_stock, show_in_catalog, deleted_at)
+            SELECT 'Producto ' || g, c.id, c.business_id, 'UNIT', 1, 2,
+                   CASE WHEN g % 10 = 0 THEN 0 ELSE 50 END, 5,
+                   g % 3 = 0,
+                   CASE WHEN g % 20 = 0 THEN now() END
+            FROM categories c
+            JOIN business_configuration b ON b.id = c.business_id AND b.slug LIKE :prefix || '%'
+            CROSS JOIN generate_series(1, :products) AS g
+        """), {"prefix": SEED_PREFIX, "products": products})
+
+        connection.execute(text("""
+            INSERT INTO menu_categories (name, business_id, display_order, is_active)
+            SELECT 'Sección ' || g || ' ' || b.slug, b.id, g, true
+            FROM business_configuration b
+            CROSS JOIN generate_series(1, :categories) AS g
+            WHERE b.slug LIKE :prefix || '%'
+        """), {"prefix": SEED_PREFIX, "categories": categories})
+
+        connection.execute(text("""
+            INSERT INTO menu_items (name, category_id, business_id, price, is_available, is_featured, deleted_at)
+            SELECT 'Platillo ' || g, mc.id, mc.business_id, 10, g % 5 <> 0, false,
+                   CASE WHEN g % 25 = 0 THEN now() END
+            FROM menu_categories mc
+            JOIN business_configuration b ON b.id = mc.business_id AND b.slug LIKE :prefix || '%'
+            CROSS JOIN generate_series(1, :per_category) AS g
+        """), {"prefix": SEED_PREFIX, "per_category": max(1, menu_items // categories)})
+
+        for table in ("products", "categories", "menu_items", "menu_categories"):
+            connection.execute(text(f"ANALYZE {table}"))
+    print("✅ Datos insertados")
+
+
+def _unscoped(db):
+    """Consultas del catálogo público antes de filtrar por negocio"""
+    db.query(Product).filter(Product.show_in_catalog == True, Product.stock > 0).all()
+    db.query(MenuItem).filter(MenuItem.is_available == True).all()
+    db.query(MenuCategory).filter(MenuCategory.is_active == True).order_by(MenuCategory.display_order).all()
+
+
+def timed(fn, db, runs: int) -> float:
+    """Mediana en milisegundos de `runs` ejecuciones"""
+    samples = []
+    for _ in range(runs):
+        db.expunge_all()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def benchmark(samples: int, runs: int):
+    db = SessionLocal()
+    try:
+        business_ids = [
+            row[0] for row in db.execute(text(
+                "SELECT id FROM business_configuration WHERE slug LIKE :prefix || '%'"
+            ), {"prefix": SEED_PREFIX})
+        ]
+        if not business_ids:
+            raise SystemExit("❌ No hay negocios de prueba (ejecuta con --seed 500)")
+        total = db.query(Product).count()
+        print(f"\n📊 {len(business_ids)} negocios, {total} productos, mediana de {runs} ejecuciones\n")
+
+        chosen = random.sample(business_ids, min(samples, len(business_ids)))
+        scoped_ms = statistics.median(
+            timed(lambda: _build(db, business_id), db, runs) for business_id in chosen
+        )
+        unscoped_ms = timed(lambda: _unscoped(db), db, runs)
+        print(f"{'catálogo por negocio (ms)':>30} | {scoped_ms:>10.2f}")
+        print(f"{'sin filtro de negocio (ms)':>30} | {unscoped_ms:>10.2f}")
+
+        print("\n🔍 Plan de la consulta de productos del catálogo:")
+        plan = db.execute(text("""
+            EXPLAIN ANALYZE
+            SELECT * FROM products
+            WHERE business_id = :business_id AND show_in_catalog = true
+              AND deleted_at IS NULL AND stock > 0
+            ORDER BY id
+        """), {"business_id": chosen[0]})
+        for (line,) in plan:
+            print(f"   {line}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del catálogo público por negocio")
+    parser.add_argument("--seed", type=int, default=0, help="Negocios de prueba a insertar antes de medir")
+    parser.add_argument("--products", type=int, default=200, help="Productos por negocio")
+    parser.add_argument("--menu-items", type=int, default=60, help="Platillos por negocio")
+    parser.add_argument("--categories", type=int, default=6, help="Categorías del menú por negocio")
+    parser.add_argument("--samples", type=int, default=20, help="Negocios medidos")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed, args.products, args.menu_items, args.categories)
+    benchmark(args.samples, args.runs)
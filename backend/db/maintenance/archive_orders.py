@@ -0,0 +1,60 @@
+"""
+Mover órdenes cerradas antiguas a las tablas de archivo
+Procesa bloques de --batch-size órdenes, cada uno en su propia transacción:
+se puede interrumpir (Ctrl+C) y volver a ejecutar, continúa donde quedó.
+--horizon-days puede diferir de ORDER_ARCHIVE_HORIZON_DAYS: las estadísticas
+unen el archivo según las órdenes archivadas del período, no según el horizonte.
+
+Ejecutar desde la raíz del backend:
+    python db/maintenance/archive_orders.py
+    python db/maintenance/archive_orders.py --horizon-days 180 --batch-size 5000 --pause 0.5
+"""
+import argparse
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.config import settings
+from app.database import SessionLocal
+from app.utils.order_archive import ARCHIVE_BATCH_SIZE, archive_orders_batch
+
+
+def run(horizon_days: int, batch_size: int, max_batches: int, pause: float):
+    cutoff = datetime.now() - timedelta(days=horizon_days)
+    print(f"📦 Archivando órdenes cerradas anteriores a {cutoff:%Y-%m-%d %H:%M}...")
+
+    db = SessionLocal()
+    total = 0
+    batches = 0
+    try:
+        while not max_batches or batches < max_batches:
+            start = time.perf_counter()
+            moved = archive_orders_batch(db, cutoff, batch_size)
+            if not moved:
+                break
+            total += moved
+            batches += 1
+            print(f"   ✓ Bloque {batches}: {moved} órdenes ({(time.perf_counter() - start) * 1000:.0f} ms), total {total}")
+            # Pausa entre bloques para no competir con el tráfico de la caja
+            if pause:
+                time.sleep(pause)
+    except KeyboardInterrupt:
+        db.rollback()
+        print("\n⏸ Interrumpido: los bloques confirmados ya están archivados, ejecuta de nuevo para continuar")
+    finally:
+        db.close()
+
+    print(f"\n✅ {total} órdenes archivadas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archivo de órdenes históricas")
+    parser.add_argument("--horizon-days", type=int, default=settings.ORDER_ARCHIVE_HORIZON_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, default=0, help="0 = hasta terminar")
+    parser.add_argument("--pause", type=float, default=0.1, help="Segundos entre bloques")
+    args = parser.parse_args()
+
+    run(args.horizon_days, args.batch_size, args.max_batches, args.pause)
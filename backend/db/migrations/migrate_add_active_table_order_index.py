@@ -0,0 +1,36 @@
+"""
+Migración: Índice parcial de la orden activa de cada mesa
+Solo contiene las órdenes pendientes o en preparación, respalda
+GET /orders/table/{table_id} y el plano del salón (GET /tables/floor)
+Ejecutar: python db/migrations/migrate_add_active_table_order_index.py
+"""
+from sqlalchemy import text
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.database import engine
+
+
+def migrate():
+    print("🔧 Creando índice de órdenes activas por mesa...")
+    
+    # CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        try:
+            connection.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_active_table_id
+                ON orders (table_id, created_at)
+                WHERE status IN ('pending', 'preparing');
+            """))
+            print("✅ Índice 'ix_orders_active_table_id' creado")
+            
+            print("\n✨ Migración completada exitosamente!")
+        except Exception as e:
+            print(f"❌ Error durante la migración: {e}")
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("MIGRACIÓN: Índice de órdenes activas por mesa")
+    print("="*50 + "\n")
+    migrate()
@@ -0,0 +1,103 @@
+"""
+Migración: Agregar business_id a productos, categorías y menú
+products, categories, menu_items y menu_categories pasan a pertenecer a un
+negocio; el catálogo público y los listados filtran por el negocio.
+Los nombres de categorías pasan a ser únicos por negocio (no globales).
+Las filas existentes sin negocio solo se asignan automáticamente si hay un
+único negocio. Con varios negocios no se puede saber de quién es cada fila:
+la migración se detiene y hay que asignarlas a mano (ver README) o indicar
+explícitamente el negocio dueño de todas con --business-id.
+Ejecutar: python db/migrations/migrate_add_business_to_catalog.py [--business-id N]
+"""
+from sqlalchemy import text
+import argparse
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.database import engine
+
+TABLES = ["products", "categories", "menu_items", "menu_categories"]
+
+# Índices parciales: las consultas siempre filtran por negocio y excluyen eliminados
+INDEXES = {
+    "ix_categories_business_id": "categories (business_id)",
+    "ix_products_business_id_active": "products (business_id) WHERE deleted_at IS NULL",
+    "ix_products_business_id_catalog": "products (business_id) WHERE show_in_catalog = true AND deleted_at IS NULL",
+    "ix_menu_items_business_id_active": "menu_items (business_id, id) WHERE deleted_at IS NULL",
+    "ix_menu_items_business_id_available": "menu_items (business_id) WHERE is_available = true AND deleted_at IS NULL",
+    "ix_menu_categories_business_id_display_order": "menu_categories (business_id, display_order) WHERE deleted_at IS NULL",
+}
+
+# Nombre de categoría único por negocio; reemplaza la restricción UNIQUE (name) global
+UNIQUE_INDEXES = {
+    "uq_categories_business_id_name": ("categories", "categories_name_key"),
+    "uq_menu_categories_business_id_name": ("menu_categories", "menu_categories_name_key"),
+}
+
+
+def migrate(business_id=None):
+    with engine.connect() as connection:
+        print("1. Agregando columna business_id...")
+        for table in TABLES:
+            connection.execute(text(f"""
+                ALTER TABLE {table}
+                ADD COLUMN IF NOT EXISTS business_id INTEGER
+                REFERENCES business_configuration(id) ON DELETE CASCADE;
+            """))
+            print(f"   ✓ {table}")
+        connection.commit()
+
+        print("2. Asignando las filas existentes sin negocio...")
+        pending = {
+            table: connection.execute(text(f"SELECT COUNT(*) FROM {table} WHERE business_id IS NULL")).scalar()
+            for table in TABLES
+        }
+        if any(pending.values()):
+            if business_id is None:
+                businesses = connection.execute(text("SELECT id FROM business_configuration")).scalars().all()
+                if len(businesses) != 1:
+                    print(f"❌ Hay {len(businesses)} negocios y filas sin negocio: {pending}")
+                    print("   Asigna cada fila a su negocio (UPDATE ... SET business_id = ...) o ejecuta")
+                    print("   con --business-id N si todas pertenecen al mismo negocio, y vuelve a ejecutar.")
+                    raise SystemExit(1)
+                business_id = businesses[0]
+            for table in TABLES:
+                result = connection.execute(
+                    text(f"UPDATE {table} SET business_id = :business_id WHERE business_id IS NULL"),
+                    {"business_id": business_id},
+                )
+                print(f"   ✓ {table}: {result.rowcount} filas -> negocio {business_id}")
+            connection.commit()
+        else:
+            print("   ✓ No hay filas sin negocio")
+
+    # CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        print("3. Creando índices por negocio...")
+        for name, definition in INDEXES.items():
+            connection.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition};"))
+            print(f"   ✓ Índice '{name}' creado")
+
+        print("4. Nombres de categorías únicos por negocio...")
+        for name, (table, old_constraint) in UNIQUE_INDEXES.items():
+            connection.execute(text(f"""
+                CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {name}
+                ON {table} (business_id, name) WHERE deleted_at IS NULL;
+            """))
+            connection.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {old_constraint};"))
+            print(f"   ✓ {table}: '{old_constraint}' reemplazada por '{name}'")
+
+        for table in TABLES:
+            connection.execute(text(f"ANALYZE {table}"))
+
+    print("\n✅ Migración completada: catálogo con business_id")
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("MIGRACIÓN: business_id en productos y menú")
+    print("="*50 + "\n")
+    parser = argparse.ArgumentParser(description="business_id en productos, categorías y menú")
+    parser.add_argument("--business-id", type=int, help="Negocio dueño de todas las filas existentes sin negocio")
+    args = parser.parse_args()
+    migrate(args.business_id)
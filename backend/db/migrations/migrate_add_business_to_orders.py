@@ -0,0 +1,80 @@
+"""
+Migración: Agregar business_id a orders (desnormalizado desde users)
+Las consultas de órdenes y estadísticas filtran por business_id directamente
+en lugar de hacer un semi-join con users.
+order_items y order_payments se filtran por negocio con un join a orders.
+Ejecutar: python db/migrations/migrate_add_business_to_orders.py
+"""
+from sqlalchemy import text
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.database import engine
+
+BATCH_SIZE = 10000  # Órdenes actualizadas por transacción en el backfill
+
+INDEXES = {
+    "ix_orders_business_id_created_at_id": "business_id, created_at, id",
+    "ix_orders_business_id_status_created_at_id": "business_id, status, created_at, id",
+    "ix_orders_business_id_payment_status_created_at_id": "business_id, payment_status, created_at, id",
+}
+
+# Reemplazados por los índices con business_id al inicio
+OLD_INDEXES = [
+    "ix_orders_created_at_id",
+    "ix_orders_status_created_at_id",
+    "ix_orders_payment_status_created_at_id",
+]
+
+
+def migrate():
+    with engine.connect() as connection:
+        print("1. Agregando columna business_id a orders...")
+        connection.execute(text("""
+            ALTER TABLE orders
+            ADD COLUMN IF NOT EXISTS business_id INTEGER
+            REFERENCES business_configuration(id) ON DELETE CASCADE;
+        """))
+        connection.commit()
+
+        # Backfill por rangos de id para no bloquear la tabla en una sola transacción
+        print("2. Copiando business_id desde el usuario de cada orden...")
+        max_id = connection.execute(text("SELECT COALESCE(MAX(id), 0) FROM orders")).scalar()
+        updated = 0
+        for start in range(0, max_id + 1, BATCH_SIZE):
+            result = connection.execute(text("""
+                UPDATE orders o
+                SET business_id = u.business_id
+                FROM users u
+                WHERE o.user_id = u.id
+                  AND o.business_id IS NULL
+                  AND o.id >= :start AND o.id < :end;
+            """), {"start": start, "end": start + BATCH_SIZE})
+            connection.commit()
+            updated += result.rowcount
+        print(f"   ✓ {updated} órdenes actualizadas")
+
+    # CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        print("3. Creando índices por negocio...")
+        for name, columns in INDEXES.items():
+            connection.execute(text(f"""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON orders ({columns});
+            """))
+            print(f"   ✓ Índice '{name}' creado")
+
+        print("4. Eliminando índices reemplazados...")
+        for name in OLD_INDEXES:
+            connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name};"))
+            print(f"   ✓ Índice '{name}' eliminado")
+
+        connection.execute(text("ANALYZE orders"))
+
+    print("\n✅ Migración completada: órdenes con business_id")
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("MIGRACIÓN: business_id en órdenes")
+    print("="*50 + "\n")
+    migrate()
@@ -0,0 +1,49 @@
+"""
+Migración: Tabla idempotency_keys
+Guarda la respuesta de POST /orders y POST /orders/{id}/payments por
+Idempotency-Key para que los reintentos no repitan la operación
+Ejecutar: python db/migrations/migrate_add_idempotency_keys.py
+"""
+from sqlalchemy import text
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.database import engine
+
+def migrate():
+    print("🔧 Creando tabla idempotency_keys...")
+    
+    with engine.connect() as connection:
+        try:
+            connection.execute(text("""
+                CREATE TABLE IF NOT EXISTS idempotency_keys (
+                    id SERIAL PRIMARY KEY,
+                    business_id INTEGER REFERENCES business_configuration(id) ON DELETE CASCADE,
+                    scope VARCHAR NOT NULL,
+                    key VARCHAR NOT NULL,
+                    request_hash VARCHAR(64) NOT NULL,
+                    response_hash VARCHAR(64),
+                    response_body TEXT,
+                    status_code INTEGER,
+                    created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+                    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                    CONSTRAINT uq_idempotency_keys_business_scope_key UNIQUE (business_id, scope, key)
+                );
+            """))
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+            """))
+            connection.commit()
+            print("✅ Tabla 'idempotency_keys' creada")
+            
+            print("\n✨ Migración completada exitosamente!")
+        except Exception as e:
+            print(f"❌ Error durante la migración: {e}")
+            connection.rollback()
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("MIGRACIÓN: Idempotency Keys")
+    print("="*50 + "\n")
+    migrate()
@@ -0,0 +1,35 @@
+"""
+Migración: Índice inverso de ingredientes (producto -> platillos)
+La clave primaria de menu_item_ingredients empieza por menu_item_id; este
+índice respalda GET /products/{id}/used-in y los recálculos por producto
+Ejecutar: python db/migrations/migrate_add_ingredient_product_index.py
+"""
+from sqlalchemy import text
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.database import engine
+
+
+def migrate():
+    print("🔧 Creando índice de ingredientes por producto...")
+    
+    # CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        try:
+            connection.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_menu_item_ingredients_product_id
+                ON menu_item_ingredients (product_id);
+            """))
+            print("✅ Índice 'ix_menu_item_ingredients_product_id' creado")
+            
+            print("\n✨ Migración completada exitosamente!")
+        except Exception as e:
+            print(f"❌ Error durante la migración: {e}")
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("MIGRACIÓN: Índice de ingredientes por producto")
+    print("="*50 + "\n")
+    migrate()
@@ -0,0 +1,38 @@
+"""
+Migración: Disponibilidad automática separada de la manual
+Agrega menu_items.auto_disabled: marca los platillos que apagó
+MENU_AUTO_AVAILABILITY por falta de stock, para que al reponer el stock solo
+se vuelvan a encender esos y no los desactivados por el gerente
+Ejecutar: python db/migrations/migrate_add_menu_auto_disabled.py
+"""
+from sqlalchemy import text
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.database import engine
+
+
+def migrate():
+    print("🔧 Agregando auto_disabled a menu_items...")
+    
+    with engine.connect() as connection:
+        try:
+            connection.execute(text("""
+                ALTER TABLE menu_items
+                ADD COLUMN IF NOT EXISTS auto_disabled BOOLEAN NOT NULL DEFAULT false;
+            """))
+            print("✅ Columna 'auto_disabled' agregada")
+            
+            # Los platillos apagados hoy se consideran apagados a mano (no se encienden solos)
+            connection.commit()
+            print("\n✨ Migración completada exitosamente!")
+        except Exception as e:
+            connection.rollback()
+            print(f"❌ Error durante la migración: {e}")
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("MIGRACIÓN: Disponibilidad automática de platillos")
+    print("="*50 + "\n")
+    migrate()
@@ -0,0 +1,49 @@
+"""
+Migración: Porciones disponibles por platillo
+Agrega menu_items.portions_available (mínimo de floor(stock / cantidad) entre
+los ingredientes) y la calcula para los platillos existentes
+Ejecutar: python db/migrations/migrate_add_menu_portions_available.py
+"""
+from sqlalchemy import text
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.database import engine
+
+
+def migrate():
+    print("🔧 Agregando porciones disponibles a menu_items...")
+    
+    with engine.connect() as connection:
+        try:
+            connection.execute(text("""
+                ALTER TABLE menu_items
+                ADD COLUMN IF NOT EXISTS portions_available INTEGER;
+            """))
+            print("✅ Columna 'portions_available' agregada")
+            
+            # Platillos sin receta quedan en NULL
+            result = connection.execute(text("""
+                UPDATE menu_items mi
+                SET portions_available = (
+                    SELECT MIN(FLOOR(GREATEST(COALESCE(p.stock, 0), 0) / mii.quantity))
+                    FROM menu_item_ingredients mii
+                    JOIN products p ON p.id = mii.product_id
+                    WHERE mii.menu_item_id = mi.id AND mii.quantity > 0
+                )
+                WHERE mi.deleted_at IS NULL;
+            """))
+            print(f"✅ Porciones calculadas para {result.rowcount} platillos")
+            
+            connection.commit()
+            print("\n✨ Migración completada exitosamente!")
+        except Exception as e:
+            connection.rollback()
+            print(f"❌ Error durante la migración: {e}")
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("MIGRACIÓN: Porciones disponibles por platillo")
+    print("="*50 + "\n")
+    migrate()
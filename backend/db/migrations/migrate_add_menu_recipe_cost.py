@@ -0,0 +1,49 @@
+"""
+Migración: Costo de receta por platillo
+Agrega menu_items.recipe_cost (suma de cantidad * precio de compra de los
+ingredientes) y lo calcula para los platillos existentes en una sola pasada
+Ejecutar: python db/migrations/migrate_add_menu_recipe_cost.py
+"""
+from sqlalchemy import text
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.database import engine
+
+
+def migrate():
+    print("🔧 Agregando costo de receta a menu_items...")
+    
+    with engine.connect() as connection:
+        try:
+            connection.execute(text("""
+                ALTER TABLE menu_items
+                ADD COLUMN IF NOT EXISTS recipe_cost DOUBLE PRECISION;
+            """))
+            print("✅ Columna 'recipe_cost' agregada")
+            
+            # Platillos sin receta quedan en NULL
+            result = connection.execute(text("""
+                UPDATE menu_items mi
+                SET recipe_cost = (
+                    SELECT SUM(mii.quantity * COALESCE(p.purchase_price, 0))
+                    FROM menu_item_ingredients mii
+                    JOIN products p ON p.id = mii.product_id
+                    WHERE mii.menu_item_id = mi.id
+                )
+                WHERE mi.deleted_at IS NULL;
+            """))
+            print(f"✅ Costo calculado para {result.rowcount} platillos")
+            
+            connection.commit()
+            print("\n✨ Migración completada exitosamente!")
+        except Exception as e:
+            connection.rollback()
+            print(f"❌ Error durante la migración: {e}")
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("MIGRACIÓN: Costo de receta por platillo")
+    print("="*50 + "\n")
+    migrate()
@@ -0,0 +1,98 @@
+"""
+Migración: Tablas de archivo de órdenes
+orders_archive y order_items_archive están particionadas por mes; las
+particiones se crean al archivar (db/maintenance/archive_orders.py)
+Ejecutar: python db/migrations/migrate_add_order_archive_tables.py
+"""
+from sqlalchemy import text
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.database import engine
+
+def migrate():
+    print("🔧 Creando tablas de archivo de órdenes...")
+    
+    with engine.connect() as connection:
+        try:
+            connection.execute(text("""
+                CREATE TABLE IF NOT EXISTS orders_archive (
+                    id INTEGER NOT NULL,
+                    created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                    table_id INTEGER,
+                    user_id INTEGER NOT NULL,
+                    business_id INTEGER,
+                    status VARCHAR NOT NULL,
+                    payment_method VARCHAR,
+                    payment_status VARCHAR NOT NULL,
+                    subtotal FLOAT,
+                    tax FLOAT,
+                    discount FLOAT,
+                    total FLOAT,
+                    customer_name VARCHAR,
+                    customer_email VARCHAR,
+                    customer_phone VARCHAR,
+                    notes TEXT,
+                    updated_at TIMESTAMP WITH TIME ZONE,
+                    paid_at TIMESTAMP WITH TIME ZONE,
+                    deleted_at TIMESTAMP WITH TIME ZONE,
+                    archived_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+                    PRIMARY KEY (id, created_at)
+                ) PARTITION BY RANGE (created_at);
+            """))
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_orders_archive_business_id_created_at
+                ON orders_archive (business_id, created_at);
+            """))
+            print("✅ Tabla 'orders_archive' creada")
+            
+            connection.execute(text("""
+                CREATE TABLE IF NOT EXISTS order_items_archive (
+                    id INTEGER NOT NULL,
+                    order_created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                    order_id INTEGER NOT NULL,
+                    product_id INTEGER,
+                    menu_item_id INTEGER,
+                    source_type VARCHAR,
+                    quantity FLOAT NOT NULL,
+                    unit_price FLOAT NOT NULL,
+                    subtotal FLOAT NOT NULL,
+                    notes TEXT,
+                    created_at TIMESTAMP WITH TIME ZONE,
+                    deleted_at TIMESTAMP WITH TIME ZONE,
+                    PRIMARY KEY (id, order_created_at)
+                ) PARTITION BY RANGE (order_created_at);
+            """))
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_order_items_archive_order_id
+                ON order_items_archive (order_id);
+            """))
+            print("✅ Tabla 'order_items_archive' creada")
+            
+            connection.execute(text("""
+                CREATE TABLE IF NOT EXISTS order_payments_archive (
+                    id INTEGER PRIMARY KEY,
+                    order_id INTEGER NOT NULL,
+                    payment_method_id INTEGER NOT NULL,
+                    amount FLOAT NOT NULL,
+                    reference VARCHAR
+                );
+            """))
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_order_payments_archive_order_id
+                ON order_payments_archive (order_id);
+            """))
+            print("✅ Tabla 'order_payments_archive' creada")
+            
+            connection.commit()
+            print("\n✨ Migración completada exitosamente!")
+        except Exception as e:
+            print(f"❌ Error durante la migración: {e}")
+            connection.rollback()
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("MIGRACIÓN: Archivo de órdenes")
+    print("="*50 + "\n")
+    migrate()
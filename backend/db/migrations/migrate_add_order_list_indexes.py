@@ -0,0 +1,43 @@
+"""
+Migración: Índices compuestos para el listado paginado de órdenes
+Respaldan la paginación por cursor (created_at, id) y los filtros por
+status, payment_status, table_id y user_id de GET /orders
+Ejecutar: python db/migrations/migrate_add_order_list_indexes.py
+"""
+from sqlalchemy import text
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.database import engine
+
+INDEXES = {
+    "ix_orders_created_at_id": "created_at, id",
+    "ix_orders_status_created_at_id": "status, created_at, id",
+    "ix_orders_payment_status_created_at_id": "payment_status, created_at, id",
+    "ix_orders_table_id_created_at_id": "table_id, created_at, id",
+    "ix_orders_user_id_created_at_id": "user_id, created_at, id",
+}
+
+
+def migrate():
+    print("🔧 Creando índices del listado de órdenes...")
+    
+    # CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        try:
+            for name, columns in INDEXES.items():
+                connection.execute(text(f"""
+                    CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON orders ({columns});
+                """))
+                print(f"✅ Índice '{name}' creado")
+            
+            print("\n✨ Migración completada exitosamente!")
+        except Exception as e:
+            print(f"❌ Error durante la migración: {e}")
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("MIGRACIÓN: Índices de listado de órdenes")
+    print("="*50 + "\n")
+    migrate()
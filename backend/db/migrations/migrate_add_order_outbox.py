@@ -0,0 +1,50 @@
+"""
+Migración: Tabla order_outbox
+Efectos secundarios de las órdenes (mesas y eventos de cocina) escritos en la
+misma transacción que la orden y procesados por los workers de la aplicación
+Ejecutar: python db/migrations/migrate_add_order_outbox.py
+"""
+from sqlalchemy import text
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.database import engine
+
+def migrate():
+    print("🔧 Creando tabla order_outbox...")
+    
+    with engine.connect() as connection:
+        try:
+            connection.execute(text("""
+                CREATE TABLE IF NOT EXISTS order_outbox (
+                    id SERIAL PRIMARY KEY,
+                    business_id INTEGER,
+                    event_type VARCHAR NOT NULL,
+                    payload TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    available_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+                    processed_at TIMESTAMP WITH TIME ZONE,
+                    created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+                );
+            """))
+            # Índice parcial: solo las filas pendientes
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_order_outbox_pending
+                ON order_outbox (available_at, id)
+                WHERE processed_at IS NULL;
+            """))
+            connection.commit()
+            print("✅ Tabla 'order_outbox' creada")
+            
+            print("\n✨ Migración completada exitosamente!")
+        except Exception as e:
+            print(f"❌ Error durante la migración: {e}")
+            connection.rollback()
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("MIGRACIÓN: Outbox de órdenes")
+    print("="*50 + "\n")
+    migrate()
@@ -0,0 +1,51 @@
+"""
+Migración: Claves de idempotencia únicas también sin negocio
+La restricción UNIQUE (business_id, scope, key) no protege a los usuarios sin
+negocio porque en PostgreSQL los NULL son distintos entre sí. Se reemplaza por
+un índice único sobre (COALESCE(business_id, 0), scope, key)
+Ejecutar: python db/migrations/migrate_idempotency_keys_null_business.py
+"""
+from sqlalchemy import text
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.database import engine
+
+
+def migrate():
+    print("🔧 Reemplazando la restricción única de idempotency_keys...")
+    
+    with engine.connect() as connection:
+        try:
+            # Duplicados que la restricción anterior dejó pasar: se conserva el primero
+            result = connection.execute(text("""
+                DELETE FROM idempotency_keys a
+                USING idempotency_keys b
+                WHERE a.business_id IS NULL AND b.business_id IS NULL
+                  AND a.scope = b.scope AND a.key = b.key
+                  AND a.id > b.id;
+            """))
+            print(f"✅ {result.rowcount} claves duplicadas sin negocio eliminadas")
+            
+            connection.execute(text("""
+                ALTER TABLE idempotency_keys
+                DROP CONSTRAINT IF EXISTS uq_idempotency_keys_business_scope_key;
+            """))
+            connection.execute(text("""
+                CREATE UNIQUE INDEX IF NOT EXISTS uq_idempotency_keys_business_scope_key
+                ON idempotency_keys (COALESCE(business_id, 0), scope, key);
+            """))
+            print("✅ Índice único 'uq_idempotency_keys_business_scope_key' creado")
+            
+            connection.commit()
+            print("\n✨ Migración completada exitosamente!")
+        except Exception as e:
+            connection.rollback()
+            print(f"❌ Error durante la migración: {e}")
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("MIGRACIÓN: Idempotency Keys sin negocio")
+    print("="*50 + "\n")
+    migrate()
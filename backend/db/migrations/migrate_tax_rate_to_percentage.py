@@ -0,0 +1,50 @@
+"""
+Migración: business_configuration.tax_rate como porcentaje
+La pantalla de configuración guarda la tasa como porcentaje (16 = 16%), pero
+el registro y el valor por defecto la guardaban como fracción (0.16).
+Las tasas menores a 1 se convierten a porcentaje (0.16 -> 16); una tasa de
+exactamente 1 se interpreta como 1%. Se agrega una restricción 0..100.
+Ejecutar: python db/migrations/migrate_tax_rate_to_percentage.py
+"""
+from sqlalchemy import text
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.database import engine
+
+
+def migrate():
+    print("🔧 Convirtiendo tax_rate a porcentaje...")
+    
+    with engine.connect() as connection:
+        try:
+            result = connection.execute(text("""
+                UPDATE business_configuration
+                SET tax_rate = tax_rate * 100
+                WHERE tax_rate > 0 AND tax_rate < 1;
+            """))
+            print(f"✅ {result.rowcount} negocios convertidos de fracción a porcentaje")
+            
+            connection.execute(text("""
+                UPDATE business_configuration SET tax_rate = 16 WHERE tax_rate IS NULL;
+                ALTER TABLE business_configuration ALTER COLUMN tax_rate SET DEFAULT 16;
+                ALTER TABLE business_configuration
+                DROP CONSTRAINT IF EXISTS ck_business_configuration_tax_rate_percent;
+                ALTER TABLE business_configuration
+                ADD CONSTRAINT ck_business_configuration_tax_rate_percent
+                CHECK (tax_rate >= 0 AND tax_rate <= 100);
+            """))
+            print("✅ Valor por defecto 16 y restricción 0..100 agregados")
+            
+            connection.commit()
+            print("\n✨ Migración completada exitosamente!")
+        except Exception as e:
+            connection.rollback()
+            print(f"❌ Error durante la migración: {e}")
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("MIGRACIÓN: tax_rate en porcentaje")
+    print("="*50 + "\n")
+    migrate()
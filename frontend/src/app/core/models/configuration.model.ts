@@ -30,6 +30,12 @@ export interface BusinessConfiguration {
   partners: Partner[];
 }
 
+// Impuesto (porcentaje, 16 = 16%) y moneda del negocio para calcular totales
+export interface BusinessPricing {
+  tax_rate: number;
+  currency: string;
+}
+
 export interface BusinessConfigurationCreate {
   business_name: string;
   slug?: string;
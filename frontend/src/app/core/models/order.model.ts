@@ -92,3 +92,10 @@ export interface UpdateOrderItems {
   items: OrderItemCreate[];
 }
 
+// Evento de GET /orders/stream: created/items_changed traen la orden completa,
+// status_changed solo los campos de estado y deleted solo el id
+export interface OrderStreamEvent {
+  type: 'order_created' | 'order_items_changed' | 'order_status_changed' | 'order_deleted' | 'reset';
+  data: Partial<Order> & { id?: number };
+}
+
@@ -1,7 +1,7 @@
 import { Injectable, inject } from '@angular/core';
 import { HttpClient } from '@angular/common/http';
 import { Observable } from 'rxjs';
-import { BusinessConfiguration, BusinessConfigurationCreate, Partner, PartnerCreate } from '../models/configuration.model';
+import { BusinessConfiguration, BusinessConfigurationCreate, BusinessPricing, Partner, PartnerCreate } from '../models/configuration.model';
 import { environment } from '../../../environments/environment';
 
 @Injectable({
@@ -24,6 +24,11 @@ export class ConfigurationService {
     return this.http.put<BusinessConfiguration>(this.apiUrl, config);
   }
   
+  // Impuesto del negocio (disponible para cualquier usuario)
+  getPricing(): Observable<BusinessPricing> {
+    return this.http.get<BusinessPricing>(`${this.apiUrl}/pricing`);
+  }
+  
   // Partners
   getPartners(): Observable<Partner[]> {
     return this.http.get<Partner[]>(`${this.apiUrl}/partners`);
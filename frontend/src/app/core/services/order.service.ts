@@ -1,14 +1,20 @@
-import { Injectable, inject } from '@angular/core';
+import { Injectable, NgZone, inject } from '@angular/core';
 import { HttpClient } from '@angular/common/http';
 import { Observable } from 'rxjs';
-import { Order, OrderCreate, AddPaymentsToOrder, UpdateOrderItems } from '../models/order.model';
+import { Order, OrderCreate, AddPaymentsToOrder, UpdateOrderItems, OrderStreamEvent } from '../models/order.model';
 import { environment } from '../../../environments/environment';
 
+const TOKEN_KEY = 'access_token';
+
+// Eventos que emite GET /orders/stream ('reset' = recargar la lista completa)
+export const ORDER_STREAM_EVENTS = ['order_created', 'order_items_changed', 'order_status_changed', 'order_deleted', 'reset'];
+
 @Injectable({
   providedIn: 'root'
 })
 export class OrderService {
   private http = inject(HttpClient);
+  private zone = inject(NgZone);
   private apiUrl = `${environment.apiUrl}/orders`;
   
   getOrders(): Observable<Order[]> {
@@ -42,5 +48,20 @@ export class OrderService {
   getOrderByTable(tableId: number): Observable<Order | null> {
     return this.http.get<Order>(`${this.apiUrl}/table/${tableId}`);
   }
+  
+  // Eventos en vivo de órdenes (SSE) con sus datos. EventSource no envía
+  // encabezados, así que el token va en la URL; al reconectar reanuda con Last-Event-ID
+  streamOrderEvents(): Observable<OrderStreamEvent> {
+    return new Observable<OrderStreamEvent>(subscriber => {
+      const token = localStorage.getItem(TOKEN_KEY) ?? '';
+      const source = new EventSource(`${this.apiUrl}/stream?access_token=${encodeURIComponent(token)}`);
+      const handler = (event: MessageEvent) => this.zone.run(() => subscriber.next({
+        type: event.type as OrderStreamEvent['type'],
+        data: JSON.parse(event.data || '{}')
+      }));
+      ORDER_STREAM_EVENTS.forEach(type => source.addEventListener(type, handler));
+      return () => source.close();
+    });
+  }
 }
 
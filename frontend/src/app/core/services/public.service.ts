@@ -15,6 +15,13 @@ export interface BusinessInfo {
   currency: string;
 }
 
+export interface PublicCatalog {
+  info: BusinessInfo;
+  categories: MenuCategory[];
+  menu: MenuItem[];
+  products: Product[];
+}
+
 @Injectable({
   providedIn: 'root'
 })
@@ -23,6 +30,11 @@ export class PublicService {
 
   constructor(private http: HttpClient) { }
 
+  // Información, categorías, menú y productos en una sola petición
+  getCatalog(slug: string): Observable<PublicCatalog> {
+    return this.http.get<PublicCatalog>(`${this.apiUrl}/${slug}/catalog`);
+  }
+
   getBusinessInfo(slug: string): Observable<BusinessInfo> {
     return this.http.get<BusinessInfo>(`${this.apiUrl}/${slug}/info`);
   }
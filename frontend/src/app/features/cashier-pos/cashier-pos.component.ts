@@ -8,6 +8,7 @@ import { ProductService } from '../../core/services/product.service';
 import { MenuService } from '../../core/services/menu.service';
 import { PaymentMethodService } from '../../core/services/payment-method.service';
 import { NotificationService } from '../../core/services/notification.service';
+import { ConfigurationService } from '../../core/services/configuration.service';
 import { Table, TableStatus } from '../../core/models/table.model';
 import { Order, UpdateOrderItems, AddPaymentsToOrder, OrderPayment } from '../../core/models/order.model';
 import { Product } from '../../core/models/product.model';
@@ -28,6 +29,7 @@ export class CashierPosComponent implements OnInit, OnDestroy {
   private menuService = inject(MenuService);
   private paymentMethodService = inject(PaymentMethodService);
   private notificationService = inject(NotificationService);
+  private configurationService = inject(ConfigurationService);
   private router = inject(Router);
   
   tables: Table[] = [];
@@ -36,6 +38,7 @@ export class CashierPosComponent implements OnInit, OnDestroy {
   productCategories: any[] = [];
   menuCategories: any[] = [];
   activePaymentMethods: PaymentMethodModel[] = [];
+  taxRate = 0.16; // Fracción; se reemplaza con la tasa del negocio
   
   currentTable: Table | null = null;
   currentOrder: Order | null = null;
@@ -67,6 +70,7 @@ export class CashierPosComponent implements OnInit, OnDestroy {
   }
   
   loadData(): void {
+    this.loadPricing();
     this.loadTables();
     this.loadProducts();
     this.loadMenuItems();
@@ -75,6 +79,13 @@ export class CashierPosComponent implements OnInit, OnDestroy {
     this.loadPaymentMethods();
   }
   
+  loadPricing(): void {
+    // La tasa se guarda como porcentaje (16 = 16%)
+    this.configurationService.getPricing().subscribe({
+      next: (pricing) => this.taxRate = pricing.tax_rate / 100
+    });
+  }
+  
   loadTables(): void {
     this.tableService.getTables().subscribe({
       next: (tables) => {
@@ -221,7 +232,7 @@ export class CashierPosComponent implements OnInit, OnDestroy {
   }
   
   get tax(): number {
-    return this.subtotal * 0.16;
+    return this.subtotal * this.taxRate;
   }
   
   get total(): number {
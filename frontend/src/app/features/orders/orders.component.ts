@@ -1,6 +1,7 @@
-import { Component, OnInit, inject } from '@angular/core';
+import { Component, OnDestroy, OnInit, inject } from '@angular/core';
 import { CommonModule } from '@angular/common';
 import { Router } from '@angular/router';
+import { Subscription } from 'rxjs';
 import { FormsModule, ReactiveFormsModule, FormBuilder, FormGroup, FormArray, Validators } from '@angular/forms';
 import { OrderService } from '../../core/services/order.service';
 import { ProductService } from '../../core/services/product.service';
@@ -9,8 +10,9 @@ import { MenuService } from '../../core/services/menu.service';
 import { PaymentMethodService } from '../../core/services/payment-method.service';
 import { NotificationService } from '../../core/services/notification.service';
 import { ConfirmService } from '../../core/services/confirm.service';
+import { ConfigurationService } from '../../core/services/configuration.service';
 import { AuthPermissionsService } from '../../core/services/auth-permissions.service';
-import { Order, OrderStatus, PaymentMethod, OrderCreate, OrderItemCreate, OrderPayment, PaymentStatus, AddPaymentsToOrder, UpdateOrderItems } from '../../core/models/order.model';
+import { Order, OrderStatus, PaymentMethod, OrderCreate, OrderItemCreate, OrderPayment, PaymentStatus, AddPaymentsToOrder, UpdateOrderItems, OrderStreamEvent } from '../../core/models/order.model';
 import { PaymentMethod as PaymentMethodModel, PAYMENT_METHOD_LABELS } from '../../core/models/payment-method.model';
 import { Product } from '../../core/models/product.model';
 import { Table, TableStatus } from '../../core/models/table.model';
@@ -24,7 +26,7 @@ import { TooltipDirective } from '../../shared/directives/tooltip.directive';
   templateUrl: './orders.component.html',
   styleUrls: ['./orders.component.scss']
 })
-export class OrdersComponent implements OnInit {
+export class OrdersComponent implements OnInit, OnDestroy {
   private orderService = inject(OrderService);
   private productService = inject(ProductService);
   private tableService = inject(TableService);
@@ -33,6 +35,7 @@ export class OrdersComponent implements OnInit {
   private fb = inject(FormBuilder);
   private notificationService = inject(NotificationService);
   private confirmService = inject(ConfirmService);
+  private configurationService = inject(ConfigurationService);
   private authPermissionsService = inject(AuthPermissionsService);
   public router = inject(Router);
   
@@ -41,6 +44,8 @@ export class OrdersComponent implements OnInit {
   menuItems: MenuItem[] = [];
   tables: Table[] = [];
   activePaymentMethods: PaymentMethodModel[] = [];
+  taxRate = 0.16; // Fracción; se reemplaza con la tasa del negocio
+  private orderEvents?: Subscription;
   
   // Pagos de la orden actual
   orderPayments: OrderPayment[] = [];
@@ -94,6 +99,37 @@ export class OrdersComponent implements OnInit {
   
   ngOnInit(): void {
     this.loadData();
+    
+    // Aplicar en la lista los cambios que hacen otras cajas o la cocina
+    this.orderEvents = this.orderService.streamOrderEvents().subscribe(event => this.applyOrderEvent(event));
+  }
+  
+  applyOrderEvent(event: OrderStreamEvent): void {
+    // Solo 'reset' (eventos perdidos) recarga la lista completa
+    if (event.type === 'reset') {
+      this.loadOrders();
+      return;
+    }
+    
+    const index = this.orders.findIndex(o => o.id === event.data.id);
+    if (event.type === 'order_deleted') {
+      if (index !== -1) {
+        this.orders.splice(index, 1);
+      }
+    } else if (event.type === 'order_status_changed') {
+      if (index !== -1) {
+        this.orders[index] = { ...this.orders[index], ...event.data };
+      }
+    } else if (index !== -1) {
+      this.orders[index] = event.data as Order;
+    } else {
+      this.orders.unshift(event.data as Order);
+      this.sortOrders();
+    }
+  }
+  
+  ngOnDestroy(): void {
+    this.orderEvents?.unsubscribe();
   }
   
   initForm(): void {
@@ -143,6 +179,11 @@ export class OrdersComponent implements OnInit {
   loadData(): void {
     this.loading = true;
     
+    // Tasa de impuesto del negocio (porcentaje, 16 = 16%)
+    this.configurationService.getPricing().subscribe({
+      next: (pricing) => this.taxRate = pricing.tax_rate / 100
+    });
+    
     // Cargar métodos de pago activos
     this.paymentMethodService.getActivePaymentMethods().subscribe({
       next: (methods) => {
@@ -150,11 +191,7 @@ export class OrdersComponent implements OnInit {
       }
     });
     
-    this.orderService.getOrders().subscribe({
-      next: (orders) => {
-        this.orders = orders.sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime());
-      }
-    });
+    this.loadOrders();
     
     this.productService.getProducts().subscribe({
       next: (products) => {
@@ -177,6 +214,19 @@ export class OrdersComponent implements OnInit {
     });
   }
   
+  loadOrders(): void {
+    this.orderService.getOrders().subscribe({
+      next: (orders) => {
+        this.orders = orders;
+        this.sortOrders();
+      }
+    });
+  }
+  
+  private sortOrders(): void {
+    this.orders.sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime());
+  }
+  
   openModal(): void {
     this.orderForm.reset();
     this.itemsArray.clear();
@@ -418,7 +468,7 @@ export class OrdersComponent implements OnInit {
       }
     }
     
-    const tax = subtotal * 0.16; // 16% IVA
+    const tax = subtotal * this.taxRate;
     return subtotal + tax;
   }
   
@@ -709,7 +759,7 @@ export class OrdersComponent implements OnInit {
       }
     }
     
-    const tax = subtotal * 0.16;
+    const tax = subtotal * this.taxRate;
     return subtotal + tax;
   }
   
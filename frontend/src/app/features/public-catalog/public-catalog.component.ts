@@ -45,11 +45,13 @@ export class PublicCatalogComponent implements OnInit {
     this.error = false;
     this.logoError = false; // Reset logo error when loading new catalog
 
-    this.publicService.getBusinessInfo(this.slug).subscribe({
-      next: (info) => {
-        this.businessInfo = info;
-        this.loadProducts();
-        this.loadMenu();
+    this.publicService.getCatalog(this.slug).subscribe({
+      next: (catalog) => {
+        this.businessInfo = catalog.info;
+        this.products = catalog.products;
+        this.menuItems = catalog.menu;
+        this.menuCategories = catalog.categories;
+        this.checkLoadingComplete();
       },
       error: () => {
         this.error = true;
@@ -58,42 +60,6 @@ export class PublicCatalogComponent implements OnInit {
     });
   }
 
-  loadProducts(): void {
-    this.publicService.getProducts(this.slug).subscribe({
-      next: (products) => {
-        this.products = products;
-        this.checkLoadingComplete();
-      },
-      error: () => {
-        this.checkLoadingComplete();
-      }
-    });
-  }
-
-  loadMenu(): void {
-    this.publicService.getMenu(this.slug).subscribe({
-      next: (menu) => {
-        this.menuItems = menu;
-        this.loadMenuCategories();
-      },
-      error: () => {
-        this.checkLoadingComplete();
-      }
-    });
-  }
-
-  loadMenuCategories(): void {
-    this.publicService.getMenuCategories(this.slug).subscribe({
-      next: (categories) => {
-        this.menuCategories = categories;
-        this.checkLoadingComplete();
-      },
-      error: () => {
-        this.checkLoadingComplete();
-      }
-    });
-  }
-
   checkLoadingComplete(): void {
     this.loading = false;
   }